@@ -18,12 +18,13 @@ async def serve() -> None:
     config_yaml = dump_to_yaml(config, scrape_keys=SENSITIVE_KEYS)
     logger.debug(f"Configuration details:\n{config_yaml}")
 
+    service = create_service(config)
     logger.info("Running main loop ...")
     async with (
         handle_signals() as handler,
-        serve_health_endpoint(config.health),
+        serve_health_endpoint(config.health, service.flight_recorder),
         serve_metrics(config.metrics),
-        create_service(config) as service,
+        service,
     ):
         handler.append(service.stop_running)
 
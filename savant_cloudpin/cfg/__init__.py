@@ -1,36 +1,64 @@
 from savant_cloudpin.cfg._bootstrap import dump_to_yaml, load_config
 from savant_cloudpin.cfg._models import (
     SENSITIVE_KEYS,
+    BatchingConfig,
     ClientServiceConfig,
     ClientSSLConfig,
     ClientWSConfig,
+    ClockSyncConfig,
+    CompressionConfig,
+    FlightRecorderConfig,
+    FlowControlConfig,
     HealthConfig,
     HistogramBoundaries,
+    LoopMonitorConfig,
     MetricsConfig,
     OTLPMetricConfig,
+    PassthroughConfig,
     PrometheusConfig,
+    SamplingConfig,
+    SchedulingConfig,
+    SerializationConfig,
     ServerServiceConfig,
     ServerSSLConfig,
     ServerWSConfig,
+    SessionConfig,
+    SheddingConfig,
+    SourceMetricsConfig,
+    SpilloverConfig,
     ZMQReaderConfig,
     ZMQWriterConfig,
 )
 
 __all__ = [
+    "BatchingConfig",
     "ClientServiceConfig",
     "ClientSSLConfig",
     "ClientWSConfig",
+    "ClockSyncConfig",
+    "CompressionConfig",
     "dump_to_yaml",
+    "FlightRecorderConfig",
+    "FlowControlConfig",
     "HealthConfig",
     "HistogramBoundaries",
     "load_config",
+    "LoopMonitorConfig",
     "MetricsConfig",
     "OTLPMetricConfig",
+    "PassthroughConfig",
     "PrometheusConfig",
+    "SamplingConfig",
+    "SchedulingConfig",
     "SENSITIVE_KEYS",
+    "SerializationConfig",
     "ServerServiceConfig",
     "ServerSSLConfig",
     "ServerWSConfig",
+    "SessionConfig",
+    "SheddingConfig",
+    "SourceMetricsConfig",
+    "SpilloverConfig",
     "ZMQReaderConfig",
     "ZMQWriterConfig",
 ]
@@ -76,6 +76,7 @@ class ServerWSConfig:
     endpoint: str
     api_key: str
     ssl: ServerSSLConfig | None = None
+    max_clients: int = 0
 
 
 @dataclass
@@ -84,11 +85,13 @@ class ClientWSConfig:
     api_key: str
     ssl: ClientSSLConfig
     reconnect_timeout: float = 2.0
+    stripes: int = 1
 
 
 @dataclass
 class HealthConfig:
     endpoint: str
+    debug: bool = False
 
 
 @dataclass
@@ -109,11 +112,118 @@ class HistogramBoundaries:
     delay: list[float] | None = field(
         default_factory=lambda: [0.005, 0.01, 0.02, 0.03, 0.04, 0.05, 0.07, 0.1]
     )
-    left_zmq_capacity: list[float] | None = None
-    consumed_zmq_capacity: list[float] | None = None
     left_ws_reading_capacity: list[float] | None = None
     consumed_ws_reading_capacity: list[float] | None = None
     message_size: list[float] | None = None
+    compression_ratio: list[float] | None = None
+    compression_time: list[float] | None = None
+    source_queue_depth: list[float] | None = None
+    queue_residence_time: list[float] | None = None
+    session_replay_size: list[float] | None = None
+    session_resume_time: list[float] | None = None
+    spillover_size: list[float] | None = None
+    clock_offset: list[float] | None = None
+    clock_rtt: list[float] | None = None
+    stage_duration: list[float] | None = None
+    loop_lag: list[float] | None = None
+
+
+@dataclass
+class BatchingConfig:
+    max_messages: int = 1
+    max_bytes: int = 1048576
+    linger: float = 0.0
+
+
+@dataclass
+class CompressionConfig:
+    codec: str | None = None
+    level: int = 3
+    min_size: int = 1024
+
+
+@dataclass
+class FlowControlConfig:
+    read_overflow: str = "drop"
+    credits: bool = False
+    high_watermark: float = 0.8
+    low_watermark: float = 0.5
+
+
+@dataclass
+class SchedulingConfig:
+    policy: str = "fifo"
+    quantum: int = 65536
+    max_pending: int = 1000
+    weights: dict[str, float] = field(default_factory=dict)
+    priority_types: list[str] = field(default_factory=list)
+
+
+@dataclass
+class SheddingConfig:
+    max_age: float = 0.0
+
+
+@dataclass
+class SessionConfig:
+    enabled: bool = False
+    replay_bytes: int = 16777216
+    grace: float = 30.0
+    ack_frames: int = 32
+    ack_interval: float = 0.5
+
+
+@dataclass
+class ClockSyncConfig:
+    enabled: bool = False
+    interval: float = 5.0
+    window: int = 8
+
+
+@dataclass
+class LoopMonitorConfig:
+    enabled: bool = False
+    interval: float = 0.1
+    threshold: float = 0.5
+
+
+@dataclass
+class PassthroughConfig:
+    enabled: bool = False
+    sample_every: int = 100
+
+
+@dataclass
+class SerializationConfig:
+    workers: int = 0
+    max_pending: int = 0
+
+
+@dataclass
+class SpilloverConfig:
+    path: str
+    max_bytes: int = 268435456
+    max_age: float = 600.0
+    drain_rate: int = 1048576
+
+
+@dataclass
+class SamplingConfig:
+    every: int = 1
+    per_second: float = 0.0
+
+
+@dataclass
+class SourceMetricsConfig:
+    enabled: bool = False
+    max_sources: int = 100
+    idle_timeout: float = 300.0
+
+
+@dataclass
+class FlightRecorderConfig:
+    enabled: bool = False
+    size: int = 1024
 
 
 @dataclass
@@ -123,12 +233,26 @@ class MetricsConfig:
     histogram_boundaries: HistogramBoundaries = field(
         default_factory=HistogramBoundaries
     )
+    sampling: SamplingConfig = field(default_factory=SamplingConfig)
+    stage_latency: bool = False
+    sources: SourceMetricsConfig = field(default_factory=SourceMetricsConfig)
+    flight_recorder: FlightRecorderConfig = field(default_factory=FlightRecorderConfig)
 
 
 class BaseServiceConfig(Protocol):
     zmq_src: ZMQReaderConfig
     zmq_sink: ZMQWriterConfig
     io_timeout: float
+    batching: BatchingConfig
+    compression: CompressionConfig
+    flow_control: FlowControlConfig
+    scheduling: SchedulingConfig
+    shedding: SheddingConfig
+    session: SessionConfig
+    clock_sync: ClockSyncConfig
+    loop_monitor: LoopMonitorConfig
+    serialization: SerializationConfig
+    passthrough: PassthroughConfig
     loglevel: str | None = field(default="warning", metadata={ALT_ENV: "LOGLEVEL"})
     health: HealthConfig | None
     metrics: MetricsConfig | None
@@ -140,6 +264,16 @@ class ServerServiceConfig(BaseServiceConfig):
     zmq_src: ZMQReaderConfig
     zmq_sink: ZMQWriterConfig
     io_timeout: float = 0.1
+    batching: BatchingConfig = field(default_factory=BatchingConfig)
+    compression: CompressionConfig = field(default_factory=CompressionConfig)
+    flow_control: FlowControlConfig = field(default_factory=FlowControlConfig)
+    scheduling: SchedulingConfig = field(default_factory=SchedulingConfig)
+    shedding: SheddingConfig = field(default_factory=SheddingConfig)
+    session: SessionConfig = field(default_factory=SessionConfig)
+    clock_sync: ClockSyncConfig = field(default_factory=ClockSyncConfig)
+    loop_monitor: LoopMonitorConfig = field(default_factory=LoopMonitorConfig)
+    serialization: SerializationConfig = field(default_factory=SerializationConfig)
+    passthrough: PassthroughConfig = field(default_factory=PassthroughConfig)
     loglevel: str | None = field(default="warning", metadata={ALT_ENV: "LOGLEVEL"})
     health: HealthConfig | None = None
     metrics: MetricsConfig | None = None
@@ -151,6 +285,17 @@ class ClientServiceConfig(BaseServiceConfig):
     zmq_src: ZMQReaderConfig
     zmq_sink: ZMQWriterConfig
     io_timeout: float = 0.1
+    batching: BatchingConfig = field(default_factory=BatchingConfig)
+    compression: CompressionConfig = field(default_factory=CompressionConfig)
+    flow_control: FlowControlConfig = field(default_factory=FlowControlConfig)
+    scheduling: SchedulingConfig = field(default_factory=SchedulingConfig)
+    shedding: SheddingConfig = field(default_factory=SheddingConfig)
+    session: SessionConfig = field(default_factory=SessionConfig)
+    clock_sync: ClockSyncConfig = field(default_factory=ClockSyncConfig)
+    loop_monitor: LoopMonitorConfig = field(default_factory=LoopMonitorConfig)
+    serialization: SerializationConfig = field(default_factory=SerializationConfig)
+    passthrough: PassthroughConfig = field(default_factory=PassthroughConfig)
+    spillover: SpilloverConfig | None = None
     loglevel: str | None = field(default="warning", metadata={ALT_ENV: "LOGLEVEL"})
     health: HealthConfig | None = None
     metrics: MetricsConfig | None = None
@@ -1,13 +1,41 @@
+import asyncio
+import cProfile
+import csv
+import io
+import marshal
+import pstats
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from typing import Final
 from urllib.parse import urlparse
 
-from aiohttp.web import Application, AppRunner, Request, Response, TCPSite
+from aiohttp.web import (
+    AppKey,
+    Application,
+    AppRunner,
+    HTTPBadRequest,
+    HTTPConflict,
+    Request,
+    Response,
+    TCPSite,
+    json_response,
+)
 from savant_rs.py.log import get_logger
 
 from savant_cloudpin.cfg import HealthConfig
+from savant_cloudpin.observability._recorder import FlightRecorder, RecordedMessage
 from savant_cloudpin.observability._utils import none_arg_returns, noop_agen
 
+PROFILE_PATH: Final = "/debug/profile"
+TASKS_PATH: Final = "/debug/tasks"
+MESSAGES_PATH: Final = "/debug/messages"
+DEFAULT_PROFILE_SECONDS: Final = 10.0
+MAX_PROFILE_SECONDS: Final = 300.0
+DEFAULT_PROFILE_LIMIT: Final = 100
+PROFILE_SORT_KEYS: Final = ("cumulative", "tottime", "calls")
+PROFILE_FORMATS: Final = ("text", "pstats")
+RECORDER_KEY: Final = AppKey("recorder", FlightRecorder)
+
 logger = get_logger(__package__ or __name__)
 
 
@@ -15,9 +43,82 @@ async def health(_: Request) -> Response:
     return Response(text="OK", status=200)
 
 
+async def profile(request: Request) -> Response:
+    try:
+        seconds = float(request.query.get("seconds", DEFAULT_PROFILE_SECONDS))
+        limit = int(request.query.get("limit", DEFAULT_PROFILE_LIMIT))
+    except ValueError as orig_err:
+        raise HTTPBadRequest(text="Invalid profiling parameters") from orig_err
+    if not 0 < seconds <= MAX_PROFILE_SECONDS or limit < 1:
+        raise HTTPBadRequest(text="Invalid profiling parameters")
+    sort = request.query.get("sort", "cumulative")
+    if sort not in PROFILE_SORT_KEYS:
+        raise HTTPBadRequest(text=f"Unsupported profile sorting '{sort}'")
+    output_format = request.query.get("format", "text")
+    if output_format not in PROFILE_FORMATS:
+        raise HTTPBadRequest(text=f"Unsupported profile format '{output_format}'")
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as orig_err:
+        raise HTTPConflict(text="Another profiler is already active") from orig_err
+    logger.warning(f"Profiling event loop for {seconds} sec.")
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.disable()
+
+    if output_format == "pstats":
+        profiler.create_stats()
+        return Response(
+            body=marshal.dumps(profiler.stats),
+            content_type="application/octet-stream",
+        )
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(sort).print_stats(limit)
+    return Response(text=stream.getvalue())
+
+
+async def tasks(_: Request) -> Response:
+    stream = io.StringIO()
+    for task in asyncio.all_tasks():
+        task.print_stack(file=stream)
+        stream.write("\n")
+    return Response(text=stream.getvalue())
+
+
+async def messages(request: Request) -> Response:
+    recorder = request.app.get(RECORDER_KEY)
+    entries = recorder.snapshot() if recorder else []
+    match request.query.get("format", "json"):
+        case "json":
+            return json_response([entry._asdict() for entry in entries])
+        case "csv":
+            return Response(text=format_csv(entries), content_type="text/csv")
+        case output_format:
+            raise HTTPBadRequest(text=f"Unsupported messages format '{output_format}'")
+
+
+def format_csv(entries: list[RecordedMessage]) -> str:
+    fields = [field for field in RecordedMessage._fields if field != "timings"]
+    labels = sorted({label for entry in entries for label in entry.timings or ()})
+    stream = io.StringIO()
+    writer = csv.writer(stream)
+    writer.writerow(fields + labels)
+    for entry in entries:
+        timings = entry.timings or {}
+        row = [getattr(entry, field) for field in fields]
+        writer.writerow(row + [timings.get(label) for label in labels])
+    return stream.getvalue()
+
+
 @asynccontextmanager
 @none_arg_returns(noop_agen)
-async def serve_health_endpoint(config: HealthConfig) -> AsyncGenerator:
+async def serve_health_endpoint(
+    config: HealthConfig, recorder: FlightRecorder | None = None
+) -> AsyncGenerator:
     url = urlparse(config.endpoint)
     if not url.scheme or url.scheme != "http":
         raise ValueError(f"Unsupported scheme for health endpoint {url.scheme}")
@@ -27,13 +128,21 @@ async def serve_health_endpoint(config: HealthConfig) -> AsyncGenerator:
     url = f"http://{host}:{port}{url.path}"
 
     app = Application()
+    if recorder:
+        app[RECORDER_KEY] = recorder
     app.router.add_get(path, health)
+    if config.debug:
+        app.router.add_get(PROFILE_PATH, profile)
+        app.router.add_get(TASKS_PATH, tasks)
+        app.router.add_get(MESSAGES_PATH, messages)
     runner = AppRunner(app)
     try:
         await runner.setup()
         site = TCPSite(runner, host, port)
         await site.start()
         logger.info(f"Health check endpoint at {url}")
+        if config.debug:
+            logger.warning(f"Debug endpoints at http://{host}:{port}/debug")
         yield
     finally:
         logger.info(f"Stop health check endpoint at {url}")
@@ -0,0 +1,54 @@
+from typing import NamedTuple
+
+type RecordedEntry = tuple[
+    float, str, bytes, str | None, int, int, int, dict[str, float] | None
+]
+
+
+class RecordedMessage(NamedTuple):
+    timestamp: float
+    service: str
+    socket: str
+    topic: str
+    source_id: str | None
+    size: int
+    enqueue_depth: int
+    dequeue_depth: int
+    timings: dict[str, float] | None
+
+
+class FlightRecorder:
+    def __init__(self, service: str, size: int) -> None:
+        if size < 1:
+            raise ValueError("Flight recorder size must be positive")
+        self.service = service
+        self.size = size
+        self.position = 0
+        self.entries: list[RecordedEntry | None] = [None] * size
+
+    def record(self, entry: RecordedEntry) -> None:
+        self.entries[self.position % self.size] = entry
+        self.position += 1
+
+    def snapshot(self) -> list[RecordedMessage]:
+        position = self.position
+        if position <= self.size:
+            entries = self.entries[:position]
+        else:
+            idx = position % self.size
+            entries = self.entries[idx:] + self.entries[:idx]
+        return [self._expand(entry) for entry in entries if entry is not None]
+
+    def _expand(self, entry: RecordedEntry) -> RecordedMessage:
+        timestamp, socket, topic, source_id, size, enqueued, dequeued, timings = entry
+        return RecordedMessage(
+            timestamp,
+            self.service,
+            socket,
+            topic.decode(errors="replace"),
+            source_id,
+            size,
+            enqueued,
+            dequeued,
+            timings,
+        )
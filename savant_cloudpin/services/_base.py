@@ -1,24 +1,79 @@
 import asyncio
+import contextlib
+import time
 from abc import abstractmethod
-from asyncio import Event, Queue
+from asyncio import Event
+from collections import deque
+from collections.abc import Callable
 from contextlib import AbstractAsyncContextManager
 from datetime import datetime, timedelta
-from typing import override
+from typing import Any, override
 
 from picows import WSCloseCode, WSFrame, WSListener, WSMsgType, WSTransport
 from savant_rs.py.log import get_logger
+from savant_rs.utils.serialization import Message
 from savant_rs.zmq import ReaderResultMessage
 
-from savant_cloudpin.cfg._models import BaseServiceConfig
+from savant_cloudpin.cfg._models import BaseServiceConfig, SamplingConfig
+from savant_cloudpin.observability._recorder import FlightRecorder
 from savant_cloudpin.services import _protocol as protocol
-from savant_cloudpin.services._measuring import Measurements
+from savant_cloudpin.services._clock import ClockEstimator
+from savant_cloudpin.services._dropping import GopDropper, SinkQueue, SinkRecord
+from savant_cloudpin.services._measuring import (
+    Lane,
+    Measurements,
+    QueueDepths,
+    Stage,
+)
+from savant_cloudpin.services._offload import (
+    OrderedOffload,
+    create_executor,
+    is_gil_enabled,
+)
+from savant_cloudpin.services._scheduling import (
+    OutboundScheduler,
+    QueuedRecord,
+    create_scheduler,
+)
+from savant_cloudpin.services._session import Session
+from savant_cloudpin.services._spill import SpillRing
+from savant_cloudpin.services._video_frame import LABEL_CLIENT_SOURCE, VideoFrameTimings
+from savant_cloudpin.services._watchdog import LoopWatchdog
 from savant_cloudpin.zmq import NonBlockingReader, NonBlockingWriter
 
 _REPORT_INTERVAL = timedelta(seconds=1)
+READ_OVERFLOW_POLICIES = ("drop", "pause", "gop")
 
 logger = get_logger(__package__ or __name__)
 
 
+type LoadedSource = tuple[Message, protocol.RawRecord, VideoFrameTimings | None]
+type LoadedSink = tuple["ServiceConnection", protocol.FrameData, int, QueueDepths]
+type PoppedSink = tuple["ServiceConnection", SinkRecord, QueueDepths]
+
+
+def record_size(record: protocol.RawRecord) -> int:
+    return len(record.topic) + len(record.body) + len(record.extra)
+
+
+def dump_src(
+    message: Message,
+    topic: bytes,
+    extra: bytes | None,
+    timings: VideoFrameTimings | None,
+) -> LoadedSource:
+    return message, protocol.dump_record(topic, message, extra), timings
+
+
+def load_sink(
+    connection: "ServiceConnection", record: SinkRecord, depths: QueueDepths
+) -> LoadedSink:
+    if isinstance(record, protocol.RawRecord):
+        data = protocol.load_record(record)
+        return connection, data, record_size(record), depths
+    return connection, record, 0, depths
+
+
 class LifeCycleServiceBase[T](AbstractAsyncContextManager[T]):
     def __init__(self, measurements: Measurements) -> None:
         self._measurements = measurements
@@ -27,6 +82,10 @@ class LifeCycleServiceBase[T](AbstractAsyncContextManager[T]):
         self.stopped = Event()
         self.stopped.set()
 
+    @property
+    def flight_recorder(self) -> FlightRecorder | None:
+        return self._measurements.recorder
+
     @abstractmethod
     async def _serve(self) -> None: ...
 
@@ -63,26 +122,225 @@ class PumpServiceBase[T](LifeCycleServiceBase[T]):
     def __init__(self, config: BaseServiceConfig, measurements: Measurements) -> None:
         super().__init__(measurements)
         self._io_timeout = config.io_timeout
+        self._batching = config.batching
+        self._compression = config.compression
+        codec = config.compression.codec
+        if codec and codec not in protocol.SUPPORTED_CODECS:
+            raise ValueError(f"Unsupported compression codec '{codec}'")
         self._zmq_sink = NonBlockingWriter(*config.zmq_sink.as_dealer().to_args())
         self._zmq_src = NonBlockingReader(*config.zmq_src.as_router().to_args())
-        self._sink_queue = Queue[bytes](
-            maxsize=2 * config.zmq_sink.max_inflight_messages
+        measurements.observe_zmq_capacity(self._zmq_sink)
+        measurements.observe_zmq_capacity(self._zmq_src)
+        flow_control = config.flow_control
+        if flow_control.read_overflow not in READ_OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unsupported read overflow policy '{flow_control.read_overflow}'"
+            )
+        if not 0 <= flow_control.low_watermark < flow_control.high_watermark <= 1:
+            raise ValueError("Invalid flow control watermarks")
+        self._sink_capacity = 2 * config.zmq_sink.max_inflight_messages
+        self._lossless_reading = flow_control.read_overflow == "pause"
+        self._gop_dropping = flow_control.read_overflow == "gop"
+        self._sink_high_watermark = max(
+            1, int(self._sink_capacity * flow_control.high_watermark)
         )
+        self._sink_low_watermark = int(self._sink_capacity * flow_control.low_watermark)
+        self._credits = flow_control.credits
+        max_age = config.shedding.max_age
+        self._src_max_age = max_age if measurements.service == "Client" else 0.0
+        self._sink_max_age = max_age if measurements.service == "Server" else 0.0
+        if max_age and measurements.sampled:
+            raise ValueError("Load shedding doesn't support sampled metrics")
+        passthrough = config.passthrough
+        if passthrough.enabled:
+            if passthrough.sample_every < 1:
+                raise ValueError("Passthrough sampling interval must be positive")
+            if (
+                max_age
+                or self._gop_dropping
+                or config.scheduling.priority_types
+                or measurements.recorder
+            ):
+                raise ValueError(
+                    "Passthrough mode doesn't support message inspecting features"
+                )
+            sampling = measurements.sampling
+            if sampling == SamplingConfig():
+                sampling = SamplingConfig(every=passthrough.sample_every)
+            measurements.configure_sampling(sampling, inspect_unsampled=False)
+        self._scheduler: OutboundScheduler | None = create_scheduler(
+            config.scheduling,
+            buffered=bool(self._src_max_age or measurements.recorder),
+        )
+        self._credit_batch = max(1, self._sink_capacity // 4)
+        self._backlog_size = max(1, config.scheduling.max_pending)
+        self._session = config.session
+        if self._session.enabled and self._session.replay_bytes <= 0:
+            raise ValueError("Session replay buffer size must be positive")
+        self._sessions = dict[str, Session]()
+        self._last_maintenance = time.monotonic()
+        self._clock_sync = config.clock_sync
+        if self._clock_sync.enabled and (
+            self._clock_sync.interval <= 0 or self._clock_sync.window < 1
+        ):
+            raise ValueError("Invalid clock synchronization settings")
+        self._loop_monitor = config.loop_monitor
+        if self._loop_monitor.enabled and (
+            self._loop_monitor.interval <= 0 or self._loop_monitor.threshold <= 0
+        ):
+            raise ValueError("Invalid event loop monitoring settings")
+        serialization = config.serialization
+        self._executor = create_executor(serialization)
+        max_pending = serialization.max_pending or 2 * serialization.workers
+        self._src_loading: OrderedOffload[LoadedSource] | None = None
+        self._sink_loading: OrderedOffload[LoadedSink] | None = None
+        if self._executor:
+            self._src_loading = OrderedOffload(self._executor, max_pending)
+            self._sink_loading = OrderedOffload(self._executor, max_pending)
+            if is_gil_enabled():
+                logger.info("GIL is enabled. Serialization scales while it's released")
+        self._spill: SpillRing | None = None
+        self._spill_rate = 0
+        self._spill_tokens = 0.0
+        self._spill_refilled = time.monotonic()
+        self._stage_latency = measurements.stage_latency
         self._sink_drops = 0
         self._last_log = datetime.now()
-        self._connection: ServiceConnection | None = None
+        self._max_connections = 1
+        self._connections = list[ServiceConnection]()
+        self._readers = deque[ServiceConnection]()
+        self._routes = dict[bytes, ServiceConnection]()
+        self._connected = Event()
+        self._flushable = Event()
+        self._sink_ready = Event()
+
+    @override
+    async def stop(self) -> None:
+        await super().stop()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
 
-    def _create_listener(self) -> WSListener:
-        return ServiceConnection(self)
+    def _create_listener(self, session: Session | None = None) -> "ServiceConnection":
+        return ServiceConnection(self, session)
 
     def _is_connected(self) -> bool:
-        return bool(self._connection and self._connection.transport)
+        return bool(self._connections)
+
+    def _accepts_connection(self) -> bool:
+        if not self._max_connections:
+            return True
+        return len(self._connections) < self._max_connections
+
+    def _add_connection(self, connection: "ServiceConnection") -> None:
+        self._connections.append(connection)
+        if connection not in self._readers:
+            self._readers.append(connection)
+        self._connected.set()
+
+    def _remove_connection(self, connection: "ServiceConnection") -> None:
+        if connection not in self._connections:
+            return
+        self._connections.remove(connection)
+        if connection.session is None:
+            self._prune_routes(lambda c: c is connection)
+        if not self._connections:
+            self._connected.clear()
 
-    def _writing_transport(self) -> WSTransport | None:
-        if self._connection and self._connection.active_writing:
-            return self._connection.transport
+    def _prune_routes(self, predicate: Callable[["ServiceConnection"], bool]) -> None:
+        routes = [topic for topic, c in self._routes.items() if predicate(c)]
+        for topic in routes:
+            del self._routes[topic]
+
+    def _route(self, topic: bytes) -> "ServiceConnection | None":
+        if connection := self._routes.get(topic):
+            return connection
+        if len(self._connections) == 1:
+            return self._connections[0]
         return None
 
+    def _resume_session(self, connection: "ServiceConnection") -> None:
+        session = connection.session
+        if session is None or connection.peer_ack is None:
+            return
+        previous = session.connection
+        if previous and previous is not connection:
+            logger.warning(f"WebSockets session {session.id} is taken over")
+            self._detach_session(previous)
+            previous.session = None
+            previous.shutdown()
+
+        resume_time = session.attach(connection)
+        for topic in session.topics:
+            if self._routes.get(topic) not in self._connections:
+                self._routes[topic] = connection
+        replay = session.replay(connection.peer_ack)
+        replay_size = 0
+        for data in replay:
+            connection.send_binary(data)
+            replay_size += len(data)
+        connection.consume_credits(session.pending_messages())
+        if resume_time is None:
+            return
+        self._measurements.measure_session_resumption(replay_size, resume_time)
+        logger.info(
+            f"WebSockets session {session.id} resumed. Replayed frames: {len(replay)}"
+        )
+
+    def _detach_session(self, connection: "ServiceConnection") -> None:
+        session = connection.session
+        if session is None or session.connection is not connection:
+            return
+        topics = [topic for topic, c in self._routes.items() if c is connection]
+        session.detach(topics)
+
+    def _maintain_sessions(self) -> None:
+        now = time.monotonic()
+        if (
+            not self._sessions
+            or now - self._last_maintenance < self._session.ack_interval
+        ):
+            return
+        self._last_maintenance = now
+        for connection in self._connections:
+            connection.send_ack()
+
+        expired = [
+            session
+            for session in self._sessions.values()
+            if session.is_expired(self._session.grace, now)
+        ]
+        for session in expired:
+            del self._sessions[session.id]
+            self._prune_routes(lambda c, expired=session: c.session is expired)
+            logger.warning(
+                f"WebSockets session {session.id} expired. "
+                f"Discarded frames: {len(session.ring)}"
+            )
+
+    def _maintain_clocks(self) -> None:
+        if not self._clock_sync.enabled:
+            return
+        now = time.monotonic()
+        for connection in self._connections:
+            connection.send_ping(now)
+
+    def _clock_offset(self, topic: bytes) -> float:
+        if not self._clock_sync.enabled:
+            return 0.0
+        connection = self._route(topic)
+        return connection.clock_offset if connection else 0.0
+
+    def _negotiation_headers(self) -> dict[str, str]:
+        headers = dict[str, str]()
+        if protocol.SUPPORTED_CODECS:
+            codecs = ",".join(protocol.SUPPORTED_CODECS)
+            headers[protocol.COMPRESSION_HEADER] = codecs
+        if self._credits:
+            headers[protocol.FLOW_CONTROL_HEADER] = protocol.CREDITS_FLOW_CONTROL
+        if self._clock_sync.enabled:
+            headers[protocol.CLOCK_SYNC_HEADER] = protocol.NTP_CLOCK_SYNC
+        return headers
+
     def _log_dropped(self) -> None:
         if not self._sink_drops:
             return
@@ -95,83 +353,654 @@ class PumpServiceBase[T](LifeCycleServiceBase[T]):
         self._sink_drops = 0
         self._last_log = datetime.now()
 
+    def _pop_sink_record(self) -> PoppedSink | None:
+        for _ in range(len(self._readers)):
+            connection = self._readers[0]
+            self._readers.rotate(-1)
+            sink_queue = connection.sink_queue
+            if not sink_queue.empty():
+                record = sink_queue.get_nowait()
+                if self._stage_latency:
+                    self._measurements.measure_stage("SinkQueue", sink_queue.residence)
+                return (
+                    connection,
+                    record,
+                    (sink_queue.enqueue_depth, sink_queue.qsize()),
+                )
+            if connection not in self._connections:
+                self._readers.pop()
+        return None
+
+    async def _next_sink_record(self) -> PoppedSink | None:
+        while self.running:
+            self._maintain_sessions()
+            self._maintain_clocks()
+            if item := self._pop_sink_record():
+                return item
+
+            self._sink_ready.clear()
+            logger.debug("Waiting inbound WebSockets ...")
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._sink_ready.wait(), self._io_timeout)
+            self._log_dropped()
+        return None
+
+    def _measure_stage(self, stage: Stage, started: float) -> None:
+        self._measurements.measure_stage(stage, time.monotonic() - started)
+
+    def _dump_src(
+        self,
+        message: Message,
+        topic: bytes,
+        extra: bytes | None,
+        timings: VideoFrameTimings | None,
+    ) -> LoadedSource:
+        if not self._stage_latency:
+            return dump_src(message, topic, extra, timings)
+        started = time.monotonic()
+        loaded = dump_src(message, topic, extra, timings)
+        self._measure_stage("Serialize", started)
+        return loaded
+
+    def _load_sink(
+        self, connection: "ServiceConnection", record: SinkRecord, depths: QueueDepths
+    ) -> LoadedSink:
+        if not self._stage_latency or not isinstance(record, protocol.RawRecord):
+            return load_sink(connection, record, depths)
+        started = time.monotonic()
+        loaded = load_sink(connection, record, depths)
+        self._measure_stage("Deserialize", started)
+        return loaded
+
+    def _compress_frame(
+        self, connection: "ServiceConnection", frame: memoryview
+    ) -> bytes | memoryview:
+        compressor = connection.compressor
+        if not compressor:
+            return frame
+
+        start = time.thread_time()
+        compressed = compressor.compress(frame)
+        if compressed is None:
+            return frame
+        cpu_time = time.thread_time() - start
+        self._measurements.measure_compression(
+            len(frame), len(compressed), cpu_time, "Compress"
+        )
+        return compressed if len(compressed) < len(frame) else frame
+
+    def _decompress_frame(self, frame: memoryview) -> bytes:
+        start = time.thread_time()
+        decompressed = protocol.decompress_stream_frame(frame)
+        cpu_time = time.thread_time() - start
+        self._measurements.measure_compression(
+            len(decompressed), len(frame), cpu_time, "Decompress"
+        )
+        return decompressed
+
+    async def _receive_src(self, timeout: float) -> ReaderResultMessage | None:
+        while msg := await self._zmq_src.receive_async(timeout):
+            if isinstance(msg, ReaderResultMessage):
+                return msg
+            timeout = 0
+        return None
+
+    async def _next_loaded_src(self, timeout: float) -> LoadedSource | None:
+        loading = self._src_loading
+        if loading is None:
+            msg = await self._receive_src(timeout)
+            if not msg:
+                return None
+            timings = self._measurements.add_src_message_measure(
+                msg.message, msg.topic, self._clock_offset(msg.topic)
+            )
+            return self._dump_src(msg.message, msg.topic, msg.data(0), timings)
+
+        while not loading.is_full():
+            msg = await self._receive_src(0 if loading else timeout)
+            if not msg:
+                break
+            timings = self._measurements.add_src_message_measure(
+                msg.message, msg.topic, self._clock_offset(msg.topic)
+            )
+            loading.submit(self._dump_src, msg.message, msg.topic, msg.data(0), timings)
+        if loaded := await loading.next():
+            return loaded
+        return None
+
+    async def _next_src_record(self, timeout: float) -> QueuedRecord | None:
+        scheduler = self._scheduler
+        if scheduler is None:
+            loaded = await self._next_loaded_src(timeout)
+            if not loaded:
+                return None
+            return QueuedRecord(loaded[1], "Bulk", 0.0)
+
+        while not scheduler.is_full():
+            loaded = await self._next_loaded_src(0 if scheduler else timeout)
+            if not loaded:
+                break
+            message, record, timings = loaded
+            priority = scheduler.is_priority(message)
+            max_age = self._src_max_age
+            if max_age and not message.is_video_frame():
+                max_age = 0.0
+            if depth := scheduler.push(record, priority, max_age, timings):
+                self._measurements.measure_source_queue_depth(depth, timings)
+
+        while item := scheduler.pop():
+            now = time.monotonic()
+            residence = now - item.enqueued
+            self._measurements.measure_queue_residence_time(item.lane, residence)
+            if not item.expires or now <= item.expires:
+                self._measurements.record_src_message(
+                    item.timings,
+                    item.record.topic,
+                    record_size(item.record),
+                    (item.depth, len(scheduler)),
+                )
+                return item
+            self._measurements.increment_shed_messages("Source", "Stale")
+        return None
+
+    async def _spill_src(self, spill: SpillRing, timeout: float) -> None:
+        if item := await self._next_src_record(timeout):
+            self._spill_record(spill, item.record)
+
+    def _spill_record(self, spill: SpillRing, record: protocol.RawRecord) -> None:
+        evicted = spill.evicted
+        if spill.push(record):
+            self._measurements.add_spillover_written(record_size(record))
+        else:
+            self._measurements.increment_shed_messages("Source", "Overflow")
+        for _ in range(spill.evicted - evicted):
+            self._measurements.increment_shed_messages("Source", "Overflow")
+        self._measurements.measure_spillover_size(spill.used)
+
+    def _drain_spill(self) -> protocol.RawRecord | None:
+        spill = self._spill
+        if not spill:
+            return None
+        now = time.monotonic()
+        refill = (now - self._spill_refilled) * self._spill_rate
+        self._spill_tokens = min(self._spill_rate, self._spill_tokens + refill)
+        self._spill_refilled = now
+        if self._spill_tokens <= 0:
+            return None
+
+        expired = spill.expired
+        record = spill.pop()
+        for _ in range(spill.expired - expired):
+            self._measurements.increment_shed_messages("Source", "Stale")
+        if record or spill.expired != expired:
+            self._measurements.measure_spillover_size(spill.used)
+        if record:
+            size = record_size(record)
+            self._spill_tokens -= size
+            self._measurements.add_spillover_drained(size)
+        return record
+
+    def _spill_wait(self) -> float:
+        if not self._spill or self._spill_tokens > 0:
+            return self._io_timeout
+        return -self._spill_tokens / self._spill_rate
+
+    def _is_stale(self, message: Message, clock_offset: float = 0.0) -> bool:
+        if not self._sink_max_age:
+            return False
+        age = VideoFrameTimings(message).get_age(LABEL_CLIENT_SOURCE)
+        return age is not None and age + clock_offset > self._sink_max_age
+
+    async def _wait_connected(self) -> None:
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._connected.wait(), self._io_timeout)
+
+    def _flush(self, connection: "ServiceConnection") -> None:
+        batch = connection.batch
+        packed = self._compress_frame(connection, batch.pack())
+        if connection.session:
+            packed = connection.session.sequence(packed, len(batch))
+        connection.send_binary(packed)
+        connection.consume_credits(len(batch))
+        if self._stage_latency:
+            self._measure_stage("Batching", batch.started)
+        batch.clear()
+        connection.blocked = False
+        connection.refill_batch()
+
+    def _flush_full(self) -> bool:
+        blocked = 0
+        for connection in self._connections:
+            connection.refill_batch()
+            while connection.needs_flush() and connection.can_flush():
+                self._flush(connection)
+            if connection.needs_flush():
+                connection.mark_blocked()
+                blocked += 1
+        return bool(blocked) and blocked == len(self._connections)
+
+    def _backlog_full(self) -> bool:
+        return any(connection.backlog_full() for connection in self._connections)
+
+    def _save_unsent(self, connection: "ServiceConnection") -> None:
+        records = list[protocol.RawRecord]()
+        if connection.batch:
+            records.extend(protocol.split_stream_frames(connection.batch.pack()))
+        records.extend(connection.backlog)
+        if not records:
+            return
+        if self._spill is not None:
+            for record in records:
+                self._spill_record(self._spill, record)
+        else:
+            self._measurements.increment_shed_messages(
+                "Source", "Disconnected", len(records)
+            )
+
+    async def _wait_flushable(self) -> None:
+        self._flushable.clear()
+        timeout = self._io_timeout
+        logger.debug(f"All WebSockets connections are blocked. Waiting {timeout} sec.")
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._flushable.wait(), timeout)
+
+    def _flush_expired(self) -> bool:
+        flushed = False
+        for connection in self._connections:
+            if not connection.batch or not connection.can_flush():
+                continue
+            if connection.batch.linger_left(self._batching.linger) <= 0:
+                self._flush(connection)
+                flushed = True
+        return flushed
+
+    def _linger_timeout(self) -> float:
+        timeout = self._io_timeout
+        for connection in self._connections:
+            if connection.batch and connection.active_writing:
+                linger_left = connection.batch.linger_left(self._batching.linger)
+                timeout = min(timeout, max(0.0, linger_left))
+        return timeout
+
+    async def _next_loaded_sink(self) -> LoadedSink | None:
+        loading = self._sink_loading
+        if loading is None:
+            if item := await self._next_sink_record():
+                return self._load_sink(*item)
+            return None
+
+        while not loading.is_full():
+            if loading:
+                item = self._pop_sink_record()
+            else:
+                item = await self._next_sink_record()
+            if not item:
+                break
+            connection, record, depths = item
+            if isinstance(record, protocol.RawRecord):
+                loading.submit(self._load_sink, connection, record, depths)
+            else:
+                loading.put((connection, record, 0, depths))
+        if loaded := await loading.next():
+            return loaded
+        return None
+
     async def _inbound_ws_loop(self) -> None:
+        writer_full: float | None = None
         while self.running:
-            self._measurements.measure_zmq_capacity(self._zmq_sink)
             while self._zmq_sink.has_capacity():
-                if self._sink_queue.empty():
-                    get_task = asyncio.create_task(self._sink_queue.get())
-                    logger.debug("Waiting inbound WebSockets ...")
-                    while not get_task.done():
-                        await asyncio.wait([get_task], timeout=self._io_timeout)
-                        self._log_dropped()
-                        self._measurements.measure_zmq_capacity(self._zmq_sink)
-                        if not self.running:
-                            return
-                    frame = await get_task
-                else:
-                    frame = self._sink_queue.get_nowait()
+                if writer_full is not None:
+                    self._measure_stage("WriterWait", writer_full)
+                    writer_full = None
+                item = await self._next_loaded_sink()
+                if item is None:
+                    return
 
-                self._measurements.measure_sink_message_data(frame)
-                topic, msg, extra = protocol.unpack_stream_frame(frame)
-                self._measurements.add_sink_message_measure(msg)
-                self._zmq_sink.send_message(topic, msg, extra)
-                self._sink_queue.task_done()
+                connection, (topic, msg, extra), size, depths = item
+                clock_offset = connection.clock_offset
+                if self._is_stale(msg, clock_offset):
+                    self._measurements.increment_shed_messages("Sink", "Stale")
+                else:
+                    timings = self._measurements.add_sink_message_measure(
+                        msg, topic, clock_offset
+                    )
+                    self._measurements.record_sink_message(timings, topic, size, depths)
+                    self._zmq_sink.send_message(topic, msg, extra)
+                connection.sink_queue.task_done()
+                connection.return_credits(1)
+                connection.resume_reading_if_drained()
                 await asyncio.sleep(0)
 
+            if self._stage_latency and writer_full is None:
+                writer_full = time.monotonic()
             logger.debug(f"ZeroMQ sink queue is full. Waiting {self._io_timeout} sec.")
             await asyncio.sleep(self._io_timeout)
             self._log_dropped()
 
+    def _dispatch(self, record: protocol.RawRecord, lane: Lane) -> None:
+        connection = self._route(record.topic)
+        if not connection:
+            self._measurements.increment_ws_route_misses()
+            logger.debug(f"No WebSockets connection for topic {record.topic!r}")
+            return
+
+        if connection.backlog or connection.needs_flush():
+            if connection.backlog_full() and self._spill is not None:
+                self._spill_record(self._spill, record)
+            else:
+                connection.backlog.append(record)
+            return
+
+        connection.batch.append_record(record)
+        if not connection.transport or (lane == "Priority" and connection.can_flush()):
+            self._flush(connection)
+
+    async def _loop_monitor_loop(self) -> None:
+        interval = self._loop_monitor.interval
+        watchdog = LoopWatchdog(self._loop_monitor.threshold)
+        watchdog.expect(time.monotonic() + interval)
+        watchdog.start()
+        try:
+            while self.running:
+                deadline = time.monotonic() + interval
+                watchdog.expect(deadline)
+                await asyncio.sleep(interval)
+                lag = max(0.0, time.monotonic() - deadline)
+                self._measurements.measure_loop_lag(lag)
+        finally:
+            watchdog.stop()
+
     async def _outbound_ws_loop(self) -> None:
         while self.running:
-            self._measurements.measure_zmq_capacity(self._zmq_src)
-            transport = self._writing_transport()
-            if not transport or self._zmq_src.is_empty():
-                if self._is_connected():
-                    logger.debug(
-                        f"WebSockets writing is paused. Waiting {self._io_timeout} sec."
-                    )
-                await asyncio.sleep(self._io_timeout)
+            if not self._connections:
+                if self._spill is not None:
+                    await self._spill_src(self._spill, self._io_timeout)
+                else:
+                    await self._wait_connected()
                 continue
 
-            while msg := self._zmq_src.try_receive():
-                if isinstance(msg, ReaderResultMessage):
-                    break
-            else:
-                logger.debug(f"ZeroMQ source is empty. Waiting {self._io_timeout} sec.")
-                await asyncio.sleep(self._io_timeout)
+            if self._flush_full() or (self._spill is None and self._backlog_full()):
+                await self._wait_flushable()
+                continue
+
+            spill = self._spill
+            if spill:
+                spilled = None
+                if not self._backlog_full():
+                    spilled = self._drain_spill()
+                if spilled:
+                    self._dispatch(spilled, "Bulk")
+                if spill:
+                    timeout = 0.0 if spilled else self._spill_wait()
+                    timeout = min(self._linger_timeout(), timeout)
+                    if item := await self._next_src_record(timeout):
+                        if spill.has_topic(item.record.topic):
+                            self._spill_record(spill, item.record)
+                        else:
+                            self._dispatch(item.record, item.lane)
+                    self._flush_expired()
+                    continue
+
+            if item := await self._next_src_record(self._linger_timeout()):
+                self._dispatch(item.record, item.lane)
                 continue
 
-            topic, message, extra = msg.topic, msg.message, msg.data(0)
-            self._measurements.add_src_message_measure(message)
-            packed = protocol.pack_stream_frame(topic, message, extra)
-            transport.send(WSMsgType.BINARY, packed)
-            self._measurements.measure_src_message_data(packed)
-            await asyncio.sleep(0)
+            if self._flush_expired():
+                await asyncio.sleep(0)
+            elif not any(connection.batch for connection in self._connections):
+                logger.debug("ZeroMQ source is empty")
 
 
 class ServiceConnection(WSListener):
     transport: WSTransport | None = None
 
-    def __init__(self, service: PumpServiceBase) -> None:
+    def __init__(
+        self, service: PumpServiceBase, session: Session | None = None
+    ) -> None:
         self.service = service
+        self.session = session
+        self.peer_ack: int | None = None
         self.measurements = service._measurements
-        self.sink_queue = service._sink_queue
+        self.sink_queue = SinkQueue(
+            maxsize=0 if service._lossless_reading else service._sink_capacity,
+            timed=service._stage_latency,
+            tracked=service._measurements.recorder is not None,
+        )
+        self.gop_dropper = GopDropper(self.sink_queue)
+        self.batch = protocol.FrameBatch(
+            service._batching.max_messages, service._batching.max_bytes
+        )
+        self.backlog = deque[protocol.RawRecord]()
+        self.blocked = False
         self.active_writing = False
+        self.reading_paused = False
+        self.writing_paused = time.monotonic()
+        self.compressor: protocol.FrameCompressor | None = None
+        self.credit_mode = False
+        self.credits = 0
+        self.pending_credits = 0
+        self.clock: ClockEstimator | None = None
 
-    def current_transport(self) -> WSTransport | None:
-        if not self.service._connection:
-            return None
-        return self.service._connection.transport
+    @property
+    def clock_offset(self) -> float:
+        return self.clock.offset if self.clock else 0.0
+
+    def set_active_writing(self, active: bool) -> None:
+        self.active_writing = active
+        if active:
+            self.service._flushable.set()
+
+    def has_credits(self, required: int) -> bool:
+        return not self.credit_mode or self.credits > required
+
+    def needs_flush(self) -> bool:
+        if not self.batch:
+            return False
+        return self.batch.is_full() or not self.has_credits(len(self.batch))
+
+    def can_flush(self) -> bool:
+        if not self.active_writing:
+            return False
+        return not self.credit_mode or self.credits >= len(self.batch)
+
+    def mark_blocked(self) -> None:
+        if self.blocked:
+            return
+        self.blocked = True
+        if not self.active_writing:
+            logger.debug("WebSockets writing is paused. Backlogging messages")
+        else:
+            self.measurements.increment_ws_credit_stalls()
+            logger.debug("WebSockets credits exhausted. Backlogging messages")
+
+    def backlog_full(self) -> bool:
+        return len(self.backlog) >= self.service._backlog_size
+
+    def refill_batch(self) -> None:
+        while self.backlog and not self.needs_flush():
+            self.batch.append_record(self.backlog.popleft())
+
+    def negotiate_compression(self, peer_codecs: str | None) -> None:
+        config = self.service._compression
+        if not config.codec:
+            return
+        if config.codec not in protocol.parse_codecs(peer_codecs):
+            logger.warning(
+                f"Peer doesn't support '{config.codec}' compression. "
+                "Continue without compression"
+            )
+            return
+
+        self.compressor = protocol.FrameCompressor(
+            config.codec, config.level, config.min_size
+        )
+        logger.info(f"WebSockets '{config.codec}' compression negotiated")
+
+    def negotiate_flow_control(self, peer_flow_control: str | None) -> None:
+        if not self.service._credits:
+            return
+        if peer_flow_control != protocol.CREDITS_FLOW_CONTROL:
+            logger.warning(
+                "Peer doesn't support credit flow control. Continue without credits"
+            )
+            return
+
+        self.credit_mode = True
+        logger.info("WebSockets credit flow control negotiated")
+        if self.transport:
+            self.grant_initial_credits()
+
+    def negotiate_clock_sync(self, peer_clock_sync: str | None) -> None:
+        config = self.service._clock_sync
+        if not config.enabled:
+            return
+        if peer_clock_sync != protocol.NTP_CLOCK_SYNC:
+            logger.warning(
+                "Peer doesn't support clock synchronization. "
+                "Continue without clock offset correction"
+            )
+            return
+
+        self.clock = ClockEstimator(config.interval, config.window)
+        logger.info("WebSockets clock synchronization negotiated")
+
+    def send_ping(self, now: float) -> None:
+        clock = self.clock
+        if not clock or not self.transport or not clock.needs_ping(now):
+            return
+        control = protocol.pack_control(protocol.PING_CONTROL, sent=time.time())
+        self.transport.send(WSMsgType.TEXT, control)
+        clock.pinged = now
+
+    def send_pong(self, sent: float) -> None:
+        if not self.transport:
+            return
+        received = time.time()
+        control = protocol.pack_control(
+            protocol.PONG_CONTROL, sent=sent, received=received, replied=time.time()
+        )
+        self.transport.send(WSMsgType.TEXT, control)
+
+    def accept_pong(self, clock: ClockEstimator, control: dict[str, Any]) -> None:
+        returned = time.time()
+        try:
+            sent = float(control["sent"])
+            received = float(control["received"])
+            replied = float(control["replied"])
+        except KeyError, TypeError, ValueError:
+            logger.warning("Invalid WebSockets clock synchronization reply. Ignoring")
+            return
+        rtt = clock.add_sample(sent, received, replied, returned)
+        self.measurements.measure_clock_sync(clock.offset, rtt)
+        logger.debug(
+            f"WebSockets clock offset {clock.offset:.6f} sec, RTT {rtt:.6f} sec"
+        )
+
+    def grant_initial_credits(self) -> None:
+        sink_queue_size = self.sink_queue.qsize()
+        self.pending_credits = 0
+        self.send_credits(max(0, self.service._sink_capacity - sink_queue_size))
+
+    def send_binary(self, data: bytes | memoryview) -> None:
+        if not self.transport:
+            return
+        self.transport.send(WSMsgType.BINARY, data)
+        self.measurements.measure_src_message_data(data)
+
+    def send_ack(self) -> None:
+        session = self.session
+        if not session or not self.transport:
+            return
+        config = self.service._session
+        now = time.monotonic()
+        if not session.needs_ack(config.ack_frames, config.ack_interval, now):
+            return
+        control = protocol.pack_control(protocol.ACK_CONTROL, seq=session.last_received)
+        self.transport.send(WSMsgType.TEXT, control)
+        session.mark_acked(now)
+
+    def accept_sequence(self, seq: int) -> bool:
+        if not self.session:
+            return True
+        missed = self.session.receive(seq)
+        if missed is None:
+            logger.debug(f"Duplicate WebSockets frame {seq}. Ignoring")
+            return False
+        if missed:
+            self.measurements.add_session_lost_frames(missed)
+            logger.warning(f"WebSockets session lost frames: {missed}")
+        return True
+
+    def send_credits(self, count: int) -> None:
+        if not self.transport or count <= 0:
+            return
+        control = protocol.pack_control(protocol.CREDIT_CONTROL, messages=count)
+        self.transport.send(WSMsgType.TEXT, control)
+
+    def return_credits(self, count: int) -> None:
+        if not self.credit_mode:
+            return
+        self.pending_credits += count
+        if self.pending_credits >= self.service._credit_batch:
+            self.send_credits(self.pending_credits)
+            self.pending_credits = 0
 
-    def set_as_current(self) -> None:
-        self.service._connection = self
+    def add_credits(self, count: int) -> None:
+        self.credits += count
+        if self.credits > 0:
+            self.service._flushable.set()
+
+    def consume_credits(self, count: int) -> None:
+        if not self.credit_mode:
+            return
+        self.credits -= count
+
+    def on_control(self, payload: str) -> None:
+        try:
+            control = protocol.unpack_control(payload)
+        except ValueError:
+            logger.warning("Invalid WebSockets control message. Ignoring")
+            return
+
+        match control["type"]:
+            case protocol.CREDIT_CONTROL:
+                self.add_credits(int(control.get("messages", 0)))
+            case protocol.ACK_CONTROL if self.session:
+                self.session.acknowledge(int(control.get("seq", 0)))
+            case protocol.PING_CONTROL:
+                self.send_pong(float(control.get("sent", 0.0)))
+            case protocol.PONG_CONTROL if self.clock:
+                self.accept_pong(self.clock, control)
+            case kind:
+                logger.warning(f"Unknown WebSockets control message '{kind}'")
 
     def increment_drops(self) -> None:
         self.measurements.increment_ws_read_drops()
         self.service._sink_drops += 1
 
+    def pause_reading(self) -> None:
+        if self.reading_paused or not self.transport:
+            return
+        self.transport.underlying_transport.pause_reading()
+        self.reading_paused = True
+        self.measurements.increment_ws_reading_pauses()
+        logger.debug("Pause WebSockets reading")
+
+    def resume_reading(self) -> None:
+        if not self.reading_paused:
+            return
+        self.reading_paused = False
+        if self.transport:
+            self.transport.underlying_transport.resume_reading()
+        self.measurements.increment_ws_reading_resumed()
+        logger.debug("Resume WebSockets reading")
+
+    def resume_reading_if_drained(self) -> None:
+        if not self.reading_paused:
+            return
+        if self.sink_queue.qsize() <= self.service._sink_low_watermark:
+            self.resume_reading()
+
     def shutdown(self) -> None:
         if self.transport:
             self.transport.send_close(WSCloseCode.GOING_AWAY)
@@ -180,41 +1009,96 @@ class ServiceConnection(WSListener):
     def on_ws_connected(self, transport: WSTransport) -> None:
         self.measurements.increment_ws_connected()
         logger.info("WebSockets connection established")
-        existing = self.current_transport()
-        if existing and transport != existing:
+        if not self.service._accepts_connection():
             transport.send_close(WSCloseCode.POLICY_VIOLATION)
-            logger.warning("Unexpected extra Websockets connection. Disconnecting...")
-        else:
-            self.transport = transport
-            self.active_writing = True
-            self.set_as_current()
+            logger.warning("WebSockets connections limit reached. Disconnecting...")
+            return
+
+        self.transport = transport
+        self.service._add_connection(self)
+        self.set_active_writing(True)
+        self.service._resume_session(self)
+        if self.credit_mode:
+            self.grant_initial_credits()
 
     @override
     def on_ws_disconnected(self, transport: WSTransport) -> None:
         self.measurements.increment_ws_disconnected()
         logger.info("WebSockets connection stopped")
         self.transport = None
-        self.active_writing = False
+        self.reading_paused = False
+        while self.batch and self.session:
+            self.service._flush(self)
+        if not self.session:
+            self.service._save_unsent(self)
+        self.credits = 0
+        self.set_active_writing(False)
+        self.batch.clear()
+        self.backlog.clear()
+        self.gop_dropper.skipping.clear()
+        self.service._detach_session(self)
+        self.service._remove_connection(self)
 
     @override
     def on_ws_frame(self, transport: WSTransport, frame: WSFrame) -> None:
+        if not self.transport:
+            return
+        if frame.msg_type == WSMsgType.TEXT:
+            self.on_control(frame.get_payload_as_utf8_text())
+            return
         if frame.msg_type != WSMsgType.BINARY:
             return
 
-        self.measurements.measure_ws_reading_capacity(self.sink_queue)
-        if not self.sink_queue.full():
-            self.sink_queue.put_nowait(frame.get_payload_as_bytes())
+        self.measurements.measure_ws_reading_capacity(
+            self.sink_queue.qsize(), self.service._sink_capacity
+        )
+        payload = frame.get_payload_as_memoryview()
+        self.measurements.measure_sink_message_data(payload)
+        seq, payload = protocol.split_sequenced_frame(payload)
+        duplicate = seq is not None and not self.accept_sequence(seq)
+        if protocol.is_compressed_frame(payload):
+            records = protocol.split_stream_frames(
+                self.service._decompress_frame(payload)
+            )
         else:
-            self.increment_drops()
+            records = protocol.split_stream_frames(payload)
+        if duplicate:
+            self.return_credits(len(records))
+            return
+
+        routes = self.service._routes
+        dropped = 0
+        for record in records:
+            routes[record.topic] = self
+            if self.service._gop_dropping:
+                if self.gop_dropper.put(protocol.load_record(record)):
+                    self.increment_drops()
+                    dropped += 1
+            elif not self.sink_queue.full():
+                self.sink_queue.put_nowait(record)
+            else:
+                self.increment_drops()
+                dropped += 1
+        self.return_credits(dropped)
+        self.service._sink_ready.set()
+        self.send_ack()
+
+        if not self.service._lossless_reading:
+            return
+        if self.sink_queue.qsize() >= self.service._sink_high_watermark:
+            self.pause_reading()
 
     @override
     def pause_writing(self) -> None:
-        self.active_writing = False
+        self.set_active_writing(False)
+        self.writing_paused = time.monotonic()
         self.measurements.increment_ws_writing_pauses()
         logger.warning("Pause WebSockets writing")
 
     @override
     def resume_writing(self) -> None:
-        self.active_writing = True
+        self.set_active_writing(True)
+        if self.service._stage_latency:
+            self.service._measure_stage("WritePaused", self.writing_paused)
         self.measurements.increment_ws_writing_resumed()
         logger.info("Resume WebSockets writing")
@@ -1,6 +1,7 @@
 import asyncio
 import ssl
-from functools import cached_property
+import zlib
+from functools import cached_property, partial
 from ssl import SSLContext
 from typing import override
 from urllib.parse import urlparse
@@ -9,9 +10,18 @@ from picows import WSError, ws_connect
 from savant_rs.py.log import get_logger
 
 from savant_cloudpin.cfg import ClientServiceConfig
-from savant_cloudpin.services._base import PumpServiceBase
+from savant_cloudpin.services._base import PumpServiceBase, ServiceConnection
 from savant_cloudpin.services._measuring import Measurements
-from savant_cloudpin.services._protocol import API_KEY_HEADER
+from savant_cloudpin.services._protocol import (
+    API_KEY_HEADER,
+    CLOCK_SYNC_HEADER,
+    COMPRESSION_HEADER,
+    FLOW_CONTROL_HEADER,
+    SESSION_ACK_HEADER,
+    SESSION_HEADER,
+)
+from savant_cloudpin.services._session import Session
+from savant_cloudpin.services._spill import SpillRing
 
 logger = get_logger(__package__ or __name__)
 
@@ -30,6 +40,17 @@ class ClientService(PumpServiceBase["ClientService"]):
         self._ssl = config.websockets.ssl
         self._api_key = config.websockets.api_key
         self._reconnect_timeout = config.websockets.reconnect_timeout
+        if config.websockets.stripes < 1:
+            raise ValueError("At least one WebSocket stripe is expected")
+        self._max_connections = config.websockets.stripes
+        self._stripes = list[ServiceConnection | None]([None] * self._max_connections)
+        if spillover := config.spillover:
+            if spillover.drain_rate <= 0:
+                raise ValueError("Spillover drain rate must be positive")
+            self._spill = SpillRing(
+                spillover.path, spillover.max_bytes, spillover.max_age
+            )
+            self._spill_rate = spillover.drain_rate
 
     @cached_property
     def _ssl_context(self) -> SSLContext | None:
@@ -45,17 +66,44 @@ class ClientService(PumpServiceBase["ClientService"]):
             logger.warning("Continue without client certificate authentication")
         return ctx
 
+    def _acquire_session(self) -> Session | None:
+        if not self._session.enabled:
+            return None
+        for session in self._sessions.values():
+            if session.connection is None:
+                return session
+        session = Session.create(self._session.replay_bytes)
+        self._sessions[session.id] = session
+        return session
+
+    def _session_headers(self, session: Session | None) -> dict[str, str]:
+        if not session:
+            return {}
+        return {
+            SESSION_HEADER: session.id,
+            SESSION_ACK_HEADER: str(session.last_received),
+        }
+
     async def _connect(self) -> None:
         try:
             self._measurements.increment_ws_connection_attempts()
 
-            _, listener = await ws_connect(
-                ws_listener_factory=self._create_listener,
+            session = self._acquire_session()
+            transport, listener = await ws_connect(
+                ws_listener_factory=partial(self._create_listener, session),
                 url=self._ws_endpoint,
                 ssl_context=self._ssl_context,
-                extra_headers={API_KEY_HEADER: self._api_key},
+                extra_headers={
+                    API_KEY_HEADER: self._api_key,
+                    **self._negotiation_headers(),
+                    **self._session_headers(session),
+                },
             )
-            if listener:
+            if isinstance(listener, ServiceConnection):
+                headers = transport.response.headers
+                listener.negotiate_compression(headers.get(COMPRESSION_HEADER))
+                listener.negotiate_flow_control(headers.get(FLOW_CONTROL_HEADER))
+                listener.negotiate_clock_sync(headers.get(CLOCK_SYNC_HEADER))
                 return
         except ConnectionRefusedError, ConnectionResetError:
             self._measurements.increment_ws_connection_errors()
@@ -77,9 +125,54 @@ class ClientService(PumpServiceBase["ClientService"]):
         self._measurements.increment_ws_connection_errors()
         raise ConnectionError("Error connecting WS. Maybe auth problems")
 
+    @override
+    def _resume_session(self, connection: ServiceConnection) -> None:
+        session = connection.session
+        if session is None or not connection.transport:
+            return
+        headers = connection.transport.response.headers
+        if headers.get(SESSION_HEADER) != session.id:
+            logger.warning("Server doesn't support sessions. Continue without session")
+            connection.session = None
+            self._sessions.pop(session.id, None)
+            return
+        connection.peer_ack = int(headers.get(SESSION_ACK_HEADER, 0))
+        super()._resume_session(connection)
+
+    def _stripe(self, topic: bytes) -> int:
+        return zlib.crc32(topic) % self._max_connections
+
+    @override
+    def _add_connection(self, connection: ServiceConnection) -> None:
+        super()._add_connection(connection)
+        stripe = self._stripes.index(None)
+        self._stripes[stripe] = connection
+        stale = [topic for topic in self._routes if self._stripe(topic) == stripe]
+        for topic in stale:
+            del self._routes[topic]
+
+    @override
+    def _remove_connection(self, connection: ServiceConnection) -> None:
+        if connection in self._stripes:
+            self._stripes[self._stripes.index(connection)] = None
+        super()._remove_connection(connection)
+
+    @override
+    def _route(self, topic: bytes) -> ServiceConnection | None:
+        stripe = self._stripe(topic)
+        if connection := self._stripes[stripe]:
+            return connection
+        if connection := self._routes.get(topic):
+            return connection
+        if not self._connections:
+            return None
+        connection = self._connections[stripe % len(self._connections)]
+        self._routes[topic] = connection
+        return connection
+
     async def _reconnect_loop(self) -> None:
         while self.running:
-            if not self._is_connected():
+            if len(self._connections) < self._max_connections:
                 logger.info("Connecting to server ...")
                 await self._connect()
             await asyncio.sleep(self._reconnect_timeout)
@@ -98,10 +191,14 @@ class ClientService(PumpServiceBase["ClientService"]):
                     self._outbound_ws_loop,
                     self._reconnect_loop,
                 ]
+                if self._loop_monitor.enabled:
+                    loops.append(self._loop_monitor_loop)
                 tasks = [asyncio.create_task(loop()) for loop in loops]
                 await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
                 self.stop_running()
                 await asyncio.gather(*tasks)
         finally:
-            if self._connection:
-                self._connection.shutdown()
+            for connection in list(self._connections):
+                connection.shutdown()
+            if self._spill is not None:
+                self._spill.flush()
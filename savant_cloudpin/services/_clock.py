@@ -0,0 +1,33 @@
+from collections import deque
+
+
+class ClockEstimator:
+    def __init__(self, interval: float, window: int) -> None:
+        self.interval = interval
+        self.samples = deque[tuple[float, float]](maxlen=window)
+        self.pinged = 0.0
+
+    @property
+    def offset(self) -> float:
+        if not self.samples:
+            return 0.0
+        _, offset = min(self.samples)
+        return offset
+
+    @property
+    def rtt(self) -> float | None:
+        if not self.samples:
+            return None
+        rtt, _ = min(self.samples)
+        return rtt
+
+    def needs_ping(self, now: float) -> bool:
+        return now - self.pinged >= self.interval
+
+    def add_sample(
+        self, sent: float, received: float, replied: float, returned: float
+    ) -> float:
+        rtt = (returned - sent) - (replied - received)
+        offset = ((received - sent) + (replied - returned)) / 2
+        self.samples.append((max(0.0, rtt), offset))
+        return rtt
@@ -0,0 +1,92 @@
+import time
+from asyncio import Queue
+from collections import deque
+
+from savant_cloudpin.services._protocol import FrameData, RawRecord
+
+type SinkRecord = RawRecord | FrameData
+
+
+def keyframe_flag(data: FrameData) -> bool | None:
+    video_frame = data.message.as_video_frame()
+    if not video_frame:
+        return None
+    keyframe = video_frame.keyframe
+    return None if keyframe is None else bool(keyframe)
+
+
+class SinkQueue(Queue[SinkRecord]):
+    def __init__(
+        self, maxsize: int = 0, timed: bool = False, tracked: bool = False
+    ) -> None:
+        self.timed = timed
+        self.tracked = tracked
+        self.residence = 0.0
+        self.enqueue_depth = 0
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int) -> None:
+        self._queue = deque[SinkRecord]()
+        self._enqueued = deque[float]()
+        self._depths = deque[int]()
+
+    def _put(self, item: SinkRecord) -> None:
+        if self.tracked:
+            self._depths.append(len(self._queue))
+        self._queue.append(item)
+        if self.timed:
+            self._enqueued.append(time.monotonic())
+
+    def _get(self) -> SinkRecord:
+        if self.timed:
+            self.residence = time.monotonic() - self._enqueued.popleft()
+        if self.tracked:
+            self.enqueue_depth = self._depths.popleft()
+        return self._queue.popleft()
+
+    def evict_gop_tail(self) -> FrameData | None:
+        items = self._queue
+        seen = set[bytes]()
+        for idx in range(len(items) - 1, -1, -1):
+            item = items[idx]
+            if item.topic in seen:
+                continue
+            seen.add(item.topic)
+            if isinstance(item, FrameData) and keyframe_flag(item) is False:
+                del items[idx]
+                if self.timed:
+                    del self._enqueued[idx]
+                if self.tracked:
+                    del self._depths[idx]
+                self.task_done()
+                return item
+        return None
+
+
+class GopDropper:
+    def __init__(self, sink_queue: SinkQueue) -> None:
+        self.sink_queue = sink_queue
+        self.skipping = set[bytes]()
+
+    def put(self, data: FrameData) -> bool:
+        keyframe = keyframe_flag(data)
+        if keyframe is False and data.topic in self.skipping:
+            return True
+        if keyframe:
+            self.skipping.discard(data.topic)
+        if not self.sink_queue.full():
+            self.sink_queue.put_nowait(data)
+            return False
+        if keyframe is False:
+            self.skipping.add(data.topic)
+            return True
+
+        evicted = self.sink_queue.evict_gop_tail()
+        if not evicted:
+            if keyframe:
+                self.skipping.add(data.topic)
+            return True
+        if evicted.topic != data.topic:
+            self.skipping.add(evicted.topic)
+        self.sink_queue.put_nowait(data)
+        return True
@@ -1,26 +1,33 @@
-from asyncio import Queue
-from collections.abc import Sequence
-from functools import cache, cached_property
-from typing import Any, Literal, TypedDict, cast
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from functools import cache, cached_property, partial
+from typing import Any, Final, Literal, TypedDict, cast
 
 from opentelemetry.metrics import (
+    CallbackOptions,
     Counter,
     Histogram,
     Instrument,
     Meter,
     MeterProvider,
     NoOpMeterProvider,
+    ObservableGauge,
+    Observation,
     get_meter_provider,
 )
 from opentelemetry.util.types import Attributes
 from savant_rs.utils.serialization import Message
 
-from savant_cloudpin.cfg import MetricsConfig
+from savant_cloudpin.cfg import MetricsConfig, SamplingConfig, SourceMetricsConfig
+from savant_cloudpin.observability._recorder import FlightRecorder
 from savant_cloudpin.services._video_frame import (
     LABEL_CLIENT_SINK,
     LABEL_CLIENT_SOURCE,
     LABEL_SERVER_SINK,
     LABEL_SERVER_SOURCE,
+    ValueLabel,
     VideoFrameTimings,
 )
 from savant_cloudpin.zmq import NonBlockingReader, NonBlockingWriter
@@ -29,10 +36,32 @@ METER_NAME = "CloudPin"
 JAEGER_TRACE_HEADER = "uber-trace-id"
 W3C_TRACE_HEADER = "traceparent"
 NOOP_METER_PROVIDER = NoOpMeterProvider()
+OTHER_SOURCE: Final = "other"
+INTERVAL_GAIN: Final = 1 / 16
+SAMPLER_IDLE_INTERVALS: Final = 16
+HISTOGRAM_BATCH_SIZE: Final = 256
 
 type ContextPropagationFormat = Literal["Jaeger", "W3C"]
 type ServiceSide = Literal["Server", "Client"]
 type ZMQSocket = Literal["Source", "Sink"]
+type CompressionOperation = Literal["Compress", "Decompress"]
+type Lane = Literal["Priority", "Bulk"]
+type ShedReason = Literal["Stale", "Overflow", "Disconnected"]
+type Stage = Literal[
+    "Serialize", "Deserialize", "Batching", "WritePaused", "SinkQueue", "WriterWait"
+]
+type CapacityProbe = tuple[Attributes, Callable[[], int], int]
+type DelayPath = tuple[ServiceSide, ServiceSide]
+type QueueDepths = tuple[int, int]
+
+DELAY_PATHS: Final[
+    tuple[tuple[ValueLabel, ValueLabel, ServiceSide, ServiceSide], ...]
+] = (
+    (LABEL_CLIENT_SOURCE, LABEL_SERVER_SINK, "Client", "Server"),
+    (LABEL_SERVER_SINK, LABEL_SERVER_SOURCE, "Server", "Server"),
+    (LABEL_SERVER_SOURCE, LABEL_CLIENT_SINK, "Server", "Client"),
+    (LABEL_CLIENT_SOURCE, LABEL_CLIENT_SINK, "Client", "Client"),
+)
 
 
 class MetricAttrs(TypedDict, total=False):
@@ -41,6 +70,205 @@ class MetricAttrs(TypedDict, total=False):
     propagation: Sequence[ContextPropagationFormat] | ContextPropagationFormat
     path_start: ServiceSide
     path_end: ServiceSide
+    operation: CompressionOperation
+    source: str
+    lane: Lane
+    reason: ShedReason
+    stage: Stage
+
+
+class MessageSampler:
+    def __init__(self, config: SamplingConfig) -> None:
+        if config.every < 1 or config.per_second < 0:
+            raise ValueError("Invalid metrics sampling")
+        self.every = config.every
+        self.interval = 1 / config.per_second if config.per_second else 0.0
+        self._skipped = 0
+        self._sources = OrderedDict[bytes, tuple[float, int]]()
+
+    @property
+    def enabled(self) -> bool:
+        return self.every > 1 or bool(self.interval)
+
+    def sample(self, source: bytes) -> int:
+        if self.interval:
+            return self._sample_source(source)
+        self._skipped += 1
+        if self._skipped < self.every:
+            return 0
+        weight, self._skipped = self._skipped, 0
+        return weight
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def _sample_source(self, source: bytes) -> int:
+        now = time.monotonic()
+        sampled, skipped = self._sources.get(source, (None, 0))
+        if sampled is not None and now - sampled < self.interval:
+            self._sources[source] = (sampled, skipped + 1)
+            return 0
+        self._sources[source] = (now, 0)
+        self._sources.move_to_end(source)
+        self._evict_idle(now)
+        return skipped + 1
+
+    def _evict_idle(self, now: float) -> None:
+        horizon = self.interval * SAMPLER_IDLE_INTERVALS
+        while self._sources:
+            source, (sampled, _) = next(iter(self._sources.items()))
+            if now - sampled <= horizon:
+                return
+            del self._sources[source]
+
+
+class SourceStats:
+    def __init__(self, seen: float) -> None:
+        self.seen = seen
+        self.interval = 0.0
+        self.jitter = 0.0
+        self.delays = dict[DelayPath, float]()
+
+    def update(self, now: float, weight: int) -> None:
+        interval = (now - self.seen) / weight
+        self.seen = now
+        if not self.interval:
+            self.interval = interval
+            return
+        deviation = abs(interval - self.interval)
+        self.jitter += (deviation - self.jitter) * INTERVAL_GAIN
+        self.interval += (interval - self.interval) * INTERVAL_GAIN
+
+    def update_delay(self, path: DelayPath, delay: float) -> None:
+        smoothed = self.delays.get(path)
+        if smoothed is None:
+            self.delays[path] = delay
+        else:
+            self.delays[path] = smoothed + (delay - smoothed) * INTERVAL_GAIN
+
+
+class SourceTracker:
+    def __init__(
+        self,
+        config: SourceMetricsConfig,
+        attrs: Callable[[str, DelayPath | None], Attributes],
+        evicted: Callable[[str], None] | None = None,
+    ) -> None:
+        if config.max_sources < 1 or config.idle_timeout < 0:
+            raise ValueError("Invalid source metrics limits")
+        self.max_sources = config.max_sources
+        self.idle_timeout = config.idle_timeout
+        self.attrs = attrs
+        self.evicted = evicted
+        self._sources = OrderedDict[str, SourceStats]()
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def track(self, source_id: str, weight: int, now: float) -> str:
+        self._evict_idle(now)
+        stats = self._sources.get(source_id)
+        if stats is not None:
+            self._sources.move_to_end(source_id)
+            stats.update(now, weight)
+            return source_id
+        if len(self._sources) >= self.max_sources:
+            return OTHER_SOURCE
+        self._sources[source_id] = SourceStats(now)
+        return source_id
+
+    def label(self, source_id: str) -> str:
+        return source_id if source_id in self._sources else OTHER_SOURCE
+
+    def track_delay(self, source_id: str, path: DelayPath, delay: float) -> None:
+        if stats := self._sources.get(source_id):
+            stats.update_delay(path, delay)
+
+    def _evict_idle(self, now: float) -> None:
+        if not self.idle_timeout:
+            return
+        while self._sources:
+            source_id, stats = next(iter(self._sources.items()))
+            if now - stats.seen <= self.idle_timeout:
+                return
+            del self._sources[source_id]
+            if self.evicted:
+                self.evicted(source_id)
+
+    def _live(self, now: float) -> list[tuple[str, SourceStats]]:
+        return [
+            (source, stats)
+            for source, stats in list(self._sources.items())
+            if not self.idle_timeout or now - stats.seen <= self.idle_timeout
+        ]
+
+    def observe_fps(self, now: float) -> list[Observation]:
+        return [
+            Observation(
+                1 / max(stats.interval, now - stats.seen), self.attrs(source, None)
+            )
+            for source, stats in self._live(now)
+            if stats.interval
+        ]
+
+    def observe_jitter(self, now: float) -> list[Observation]:
+        return [
+            Observation(stats.jitter, self.attrs(source, None))
+            for source, stats in self._live(now)
+            if stats.interval
+        ]
+
+    def observe_delay(self, now: float) -> list[Observation]:
+        return [
+            Observation(delay, self.attrs(source, path))
+            for source, stats in self._live(now)
+            for path, delay in list(stats.delays.items())
+        ]
+
+
+class LocalCounter:
+    def __init__(self) -> None:
+        self._totals = dict[int, tuple[Attributes, int]]()
+        self._lock = threading.Lock()
+
+    def add(self, amount: int, attributes: Attributes = None) -> None:
+        key = id(attributes)
+        with self._lock:
+            total = self._totals.get(key)
+            self._totals[key] = (attributes, total[1] + amount if total else amount)
+
+    def observe(self, options: CallbackOptions) -> Iterable[Observation]:
+        with self._lock:
+            totals = list(self._totals.values())
+        return [Observation(total, attrs) for attrs, total in totals]
+
+    def discard(self, attributes: Attributes) -> None:
+        with self._lock:
+            self._totals.pop(id(attributes), None)
+
+
+class BatchedHistogram:
+    def __init__(self, histogram: Histogram) -> None:
+        self._histogram = histogram
+        self._pending = list[tuple[float, Attributes]]()
+        self._lock = threading.Lock()
+
+    def record(self, amount: float, attributes: Attributes = None) -> None:
+        with self._lock:
+            self._pending.append((amount, attributes))
+            if len(self._pending) < HISTOGRAM_BATCH_SIZE:
+                return
+            pending, self._pending = self._pending, []
+        self._replay(pending)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        self._replay(pending)
+
+    def _replay(self, pending: list[tuple[float, Attributes]]) -> None:
+        for amount, attributes in pending:
+            self._histogram.record(amount, attributes)
 
 
 class Metrics:
@@ -48,6 +276,9 @@ class Metrics:
 
     def __init__(self, config: MetricsConfig) -> None:
         self._boundaries = config.histogram_boundaries
+        self.source_trackers = list[SourceTracker]()
+        self.zmq_capacity = list[CapacityProbe]()
+        self._batched = list[BatchedHistogram]()
 
     @cached_property
     def _meter(self) -> Meter:
@@ -57,77 +288,285 @@ class Metrics:
         attrs = [
             attr
             for attr, val in self.__dict__.items()
-            if isinstance(val, (Instrument, Meter))
+            if isinstance(val, (Instrument, Meter, LocalCounter, BatchedHistogram))
         ]
         for attr in attrs:
             del self.__dict__[attr]
+        self._batched.clear()
 
     def reset_meter_provider(self) -> None:
         self._meter_provider = get_meter_provider()
         self._reset_cache()
+        if self.zmq_capacity:
+            self._create_zmq_capacity_gauges()
+
+    def add_zmq_capacity(self, probe: CapacityProbe) -> None:
+        self.zmq_capacity.append(probe)
+        self._create_zmq_capacity_gauges()
+
+    def _create_zmq_capacity_gauges(self) -> None:
+        for attr in ("left_zmq_capacity", "consumed_zmq_capacity"):
+            getattr(self, attr)
+
+    def _create_histogram(
+        self, name: str, description: str, boundaries: list[float] | None
+    ) -> Histogram:
+        return self._meter.create_histogram(
+            name=name,
+            description=description,
+            explicit_bucket_boundaries_advisory=boundaries or None,
+        )
+
+    def _batch_histogram(
+        self, name: str, description: str, boundaries: list[float] | None
+    ) -> BatchedHistogram:
+        if not self._batched:
+            self._meter.create_observable_gauge(
+                name="histogram_batches", callbacks=[self._flush_histograms]
+            )
+        batched = BatchedHistogram(
+            self._create_histogram(name, description, boundaries)
+        )
+        self._batched.append(batched)
+        return batched
+
+    def _flush_histograms(self, options: CallbackOptions) -> Iterable[Observation]:
+        for batched in list(self._batched):
+            batched.flush()
+        return ()
+
+    def _aggregate_counter(self, name: str, description: str) -> LocalCounter:
+        local = LocalCounter()
+        self._meter.create_observable_counter(
+            name=name, callbacks=[local.observe], description=description
+        )
+        return local
 
     @cached_property
-    def traces(self) -> Counter:
-        return self._meter.create_counter(
+    def traces(self) -> LocalCounter:
+        return self._aggregate_counter(
             name="traces", description="ZeroMQ message telemetry traces"
         )
 
     @cached_property
-    def messages(self) -> Counter:
-        return self._meter.create_counter(
-            name="messages", description="ZeroMQ messages"
-        )
+    def messages(self) -> LocalCounter:
+        return self._aggregate_counter(name="messages", description="ZeroMQ messages")
 
     @cached_property
-    def delay(self) -> Histogram:
-        return self._meter.create_histogram(
+    def delay(self) -> BatchedHistogram:
+        return self._batch_histogram(
             name="delay",
             description="Delay caused by message processing",
-            explicit_bucket_boundaries_advisory=self._boundaries.delay or None,
+            boundaries=self._boundaries.delay,
         )
 
     @cached_property
-    def left_zmq_capacity(self) -> Histogram:
-        return self._meter.create_histogram(
+    def source_messages(self) -> LocalCounter:
+        self._meter.create_observable_gauge(
+            name="source_fps",
+            callbacks=[self._observe_source_fps],
+            description="Video frames per second per source",
+        )
+        self._meter.create_observable_gauge(
+            name="source_jitter",
+            callbacks=[self._observe_source_jitter],
+            description="Video frame inter-arrival jitter per source",
+        )
+        self._meter.create_observable_gauge(
+            name="source_delay",
+            callbacks=[self._observe_source_delay],
+            description="Smoothed delay caused by message processing per source",
+        )
+        return self._aggregate_counter(
+            name="source_messages", description="ZeroMQ video frames per source"
+        )
+
+    def _observe_source_fps(self, options: CallbackOptions) -> Iterable[Observation]:
+        now = time.monotonic()
+        return [obs for t in self.source_trackers for obs in t.observe_fps(now)]
+
+    def _observe_source_jitter(self, options: CallbackOptions) -> Iterable[Observation]:
+        now = time.monotonic()
+        return [obs for t in self.source_trackers for obs in t.observe_jitter(now)]
+
+    def _observe_source_delay(self, options: CallbackOptions) -> Iterable[Observation]:
+        now = time.monotonic()
+        return [obs for t in self.source_trackers for obs in t.observe_delay(now)]
+
+    @cached_property
+    def left_zmq_capacity(self) -> ObservableGauge:
+        return self._meter.create_observable_gauge(
             name="left_zmq_capacity",
+            callbacks=[self._observe_left_zmq_capacity],
             description="Left ZeroMQ socket capacity",
-            explicit_bucket_boundaries_advisory=self._boundaries.left_zmq_capacity
-            or None,
         )
 
     @cached_property
-    def consumed_zmq_capacity(self) -> Histogram:
-        return self._meter.create_histogram(
+    def consumed_zmq_capacity(self) -> ObservableGauge:
+        return self._meter.create_observable_gauge(
             name="consumed_zmq_capacity",
+            callbacks=[self._observe_consumed_zmq_capacity],
             description="Consumed ZeroMQ socket capacity",
-            explicit_bucket_boundaries_advisory=self._boundaries.consumed_zmq_capacity
-            or None,
         )
 
+    def _observe_left_zmq_capacity(
+        self, options: CallbackOptions
+    ) -> Iterable[Observation]:
+        return [
+            Observation(total - consumed(), attrs)
+            for attrs, consumed, total in self.zmq_capacity
+        ]
+
+    def _observe_consumed_zmq_capacity(
+        self, options: CallbackOptions
+    ) -> Iterable[Observation]:
+        return [
+            Observation(consumed(), attrs) for attrs, consumed, _ in self.zmq_capacity
+        ]
+
     @cached_property
     def left_ws_reading_capacity(self) -> Histogram:
-        return self._meter.create_histogram(
+        return self._create_histogram(
             name="left_ws_reading_capacity",
             description="Left WebSockets reading queue capacity",
-            explicit_bucket_boundaries_advisory=self._boundaries.left_ws_reading_capacity
-            or None,
+            boundaries=self._boundaries.left_ws_reading_capacity,
         )
 
     @cached_property
     def consumed_ws_reading_capacity(self) -> Histogram:
-        return self._meter.create_histogram(
+        return self._create_histogram(
             name="consumed_ws_reading_capacity",
             description="Consumed WebSockets reading queue capacity",
-            explicit_bucket_boundaries_advisory=self._boundaries.consumed_ws_reading_capacity
-            or None,
+            boundaries=self._boundaries.consumed_ws_reading_capacity,
         )
 
     @cached_property
-    def message_size(self) -> Histogram:
-        return self._meter.create_histogram(
+    def message_size(self) -> BatchedHistogram:
+        return self._batch_histogram(
             name="message_size",
             description="Data size of WebSockets message",
-            explicit_bucket_boundaries_advisory=self._boundaries.message_size or None,
+            boundaries=self._boundaries.message_size,
+        )
+
+    @cached_property
+    def compression_ratio(self) -> Histogram:
+        return self._meter.create_histogram(
+            name="compression_ratio",
+            description="Ratio of original to compressed WebSockets message size",
+            explicit_bucket_boundaries_advisory=self._boundaries.compression_ratio
+            or None,
+        )
+
+    @cached_property
+    def compression_time(self) -> Histogram:
+        return self._meter.create_histogram(
+            name="compression_time",
+            description="CPU time spent on WebSockets message (de)compression",
+            explicit_bucket_boundaries_advisory=self._boundaries.compression_time
+            or None,
+        )
+
+    @cached_property
+    def source_queue_depth(self) -> Histogram:
+        return self._meter.create_histogram(
+            name="source_queue_depth",
+            description="Messages queued per source for WebSockets sending",
+            explicit_bucket_boundaries_advisory=self._boundaries.source_queue_depth
+            or None,
+        )
+
+    @cached_property
+    def queue_residence_time(self) -> Histogram:
+        return self._meter.create_histogram(
+            name="queue_residence_time",
+            description="Time spent by message in outbound scheduling queue",
+            explicit_bucket_boundaries_advisory=self._boundaries.queue_residence_time
+            or None,
+        )
+
+    @cached_property
+    def shed_messages(self) -> Counter:
+        return self._meter.create_counter(
+            name="shed_messages", description="Messages dropped by load shedding"
+        )
+
+    @cached_property
+    def session_replay_size(self) -> Histogram:
+        return self._meter.create_histogram(
+            name="session_replay_size",
+            description="Data size replayed on WebSockets session resumption",
+            explicit_bucket_boundaries_advisory=self._boundaries.session_replay_size
+            or None,
+        )
+
+    @cached_property
+    def session_resume_time(self) -> Histogram:
+        return self._meter.create_histogram(
+            name="session_resume_time",
+            description="Time from WebSockets disconnection to session resumption",
+            explicit_bucket_boundaries_advisory=self._boundaries.session_resume_time
+            or None,
+        )
+
+    @cached_property
+    def session_lost_frames(self) -> Counter:
+        return self._meter.create_counter(
+            name="session_lost_frames",
+            description="WebSockets frames lost in session sequence",
+        )
+
+    @cached_property
+    def spillover_size(self) -> Histogram:
+        return self._meter.create_histogram(
+            name="spillover_size",
+            description="Data size held in the spillover buffer",
+            explicit_bucket_boundaries_advisory=self._boundaries.spillover_size or None,
+        )
+
+    @cached_property
+    def spillover_written(self) -> Counter:
+        return self._meter.create_counter(
+            name="spillover_written",
+            description="Data size written to the spillover buffer",
+        )
+
+    @cached_property
+    def spillover_drained(self) -> Counter:
+        return self._meter.create_counter(
+            name="spillover_drained",
+            description="Data size drained from the spillover buffer",
+        )
+
+    @cached_property
+    def clock_offset(self) -> Histogram:
+        return self._meter.create_histogram(
+            name="clock_offset",
+            description="Estimated clock offset of WebSockets peer",
+            explicit_bucket_boundaries_advisory=self._boundaries.clock_offset or None,
+        )
+
+    @cached_property
+    def clock_rtt(self) -> Histogram:
+        return self._meter.create_histogram(
+            name="clock_rtt",
+            description="Round-trip time of WebSockets clock synchronization",
+            explicit_bucket_boundaries_advisory=self._boundaries.clock_rtt or None,
+        )
+
+    @cached_property
+    def stage_duration(self) -> Histogram:
+        return self._meter.create_histogram(
+            name="stage_duration",
+            description="Time spent by message in processing stage",
+            explicit_bucket_boundaries_advisory=self._boundaries.stage_duration or None,
+        )
+
+    @cached_property
+    def loop_lag(self) -> Histogram:
+        return self._meter.create_histogram(
+            name="loop_lag",
+            description="Event loop lag of scheduled wake-ups",
+            explicit_bucket_boundaries_advisory=self._boundaries.loop_lag or None,
         )
 
     @cached_property
@@ -142,6 +581,30 @@ class Metrics:
             name="ws_writing_resumed", description="Resumed WebSockets writing"
         )
 
+    @cached_property
+    def ws_reading_pauses(self) -> Counter:
+        return self._meter.create_counter(
+            name="ws_reading_pauses", description="WebSockets reading pauses"
+        )
+
+    @cached_property
+    def ws_reading_resumed(self) -> Counter:
+        return self._meter.create_counter(
+            name="ws_reading_resumed", description="Resumed WebSockets reading"
+        )
+
+    @cached_property
+    def ws_credit_stalls(self) -> Counter:
+        return self._meter.create_counter(
+            name="ws_credit_stalls", description="WebSockets writing credit stalls"
+        )
+
+    @cached_property
+    def ws_route_misses(self) -> Counter:
+        return self._meter.create_counter(
+            name="ws_route_misses", description="Messages without WebSockets route"
+        )
+
     @cached_property
     def ws_connection_attempts(self) -> Counter:
         return self._meter.create_counter(
@@ -178,10 +641,53 @@ class Metrics:
 class Measurements:
     def __init__(self, service: ServiceSide, config: MetricsConfig | None) -> None:
         self._service = service
-        self.metrics = Metrics(config or MetricsConfig())
+        config = config or MetricsConfig()
+        self.metrics = Metrics(config)
+        self.stage_latency = config.stage_latency
+        self.configure_sampling(config.sampling)
+        self._sources: dict[ZMQSocket, SourceTracker] = {}
+        self._tracked_attrs = dict[
+            tuple[ZMQSocket, str], dict[DelayPath | None, Attributes]
+        ]()
+        if config.sources.enabled:
+            sources = config.sources
+            self._sources = {
+                "Source": self._create_tracker(sources, "Source"),
+                "Sink": self._create_tracker(sources, "Sink"),
+            }
+            self.metrics.source_trackers.extend(self._sources.values())
+        self.recorder: FlightRecorder | None = None
+        if config.flight_recorder.enabled:
+            self.recorder = FlightRecorder(service, config.flight_recorder.size)
+
+    def _create_tracker(
+        self, config: SourceMetricsConfig, socket: ZMQSocket
+    ) -> SourceTracker:
+        return SourceTracker(
+            config,
+            partial(self._source_attrs, socket),
+            partial(self._evict_source, socket),
+        )
+
+    def configure_sampling(
+        self, config: SamplingConfig, inspect_unsampled: bool = True
+    ) -> None:
+        self.sampling = config
+        self._inspect_unsampled = inspect_unsampled
+        self._samplers: dict[ZMQSocket, MessageSampler] = {
+            "Source": MessageSampler(config),
+            "Sink": MessageSampler(config),
+        }
+
+    @property
+    def service(self) -> ServiceSide:
+        return self._service
+
+    @property
+    def sampled(self) -> bool:
+        return self._samplers["Source"].enabled
 
-    @cache
-    def _attrs(
+    def _make_attrs(
         self,
         *,
         socket: ZMQSocket | None = None,
@@ -189,6 +695,11 @@ class Measurements:
         jaeger_propagation: bool = False,
         path_start: ServiceSide | None = None,
         path_end: ServiceSide | None = None,
+        operation: CompressionOperation | None = None,
+        source: str | None = None,
+        lane: Lane | None = None,
+        reason: ShedReason | None = None,
+        stage: Stage | None = None,
     ) -> Attributes:
         attrs = MetricAttrs(service=self._service)
         if socket:
@@ -197,6 +708,16 @@ class Measurements:
             attrs.update(path_start=path_start)
         if path_end:
             attrs.update(path_end=path_end)
+        if operation:
+            attrs.update(operation=operation)
+        if source:
+            attrs.update(source=source)
+        if lane:
+            attrs.update(lane=lane)
+        if reason:
+            attrs.update(reason=reason)
+        if stage:
+            attrs.update(stage=stage)
         match w3c_propagation, jaeger_propagation:
             case True, False:
                 attrs.update(propagation="W3C")
@@ -208,18 +729,115 @@ class Measurements:
                 pass
         return cast(Attributes, attrs)
 
-    def add_sink_message_measure(self, message: Message) -> None:
-        self._add_message_measure(message, socket="Sink")
+    _attrs = cache(_make_attrs)
 
-    def add_src_message_measure(self, message: Message) -> None:
-        self._add_message_measure(message, socket="Source")
+    def _source_attrs(
+        self, socket: ZMQSocket, source: str, path: DelayPath | None = None
+    ) -> Attributes:
+        cached = self._tracked_attrs.setdefault((socket, source), {})
+        attrs = cached.get(path)
+        if attrs is None:
+            path_start, path_end = path or (None, None)
+            attrs = cached.setdefault(
+                path,
+                self._make_attrs(
+                    socket=socket,
+                    source=source,
+                    path_start=path_start,
+                    path_end=path_end,
+                ),
+            )
+        return attrs
+
+    def _evict_source(self, socket: ZMQSocket, source: str) -> None:
+        cached = self._tracked_attrs.pop((socket, source), {})
+        if (attrs := cached.get(None)) is not None:
+            self.metrics.source_messages.discard(attrs)
+
+    def add_sink_message_measure(
+        self, message: Message, topic: bytes = b"", clock_offset: float = 0.0
+    ) -> VideoFrameTimings | None:
+        return self._add_message_measure(message, topic, "Sink", clock_offset)
+
+    def add_src_message_measure(
+        self, message: Message, topic: bytes = b"", clock_offset: float = 0.0
+    ) -> VideoFrameTimings | None:
+        return self._add_message_measure(message, topic, "Source", clock_offset)
+
+    def _add_message_measure(
+        self, message: Message, topic: bytes, socket: ZMQSocket, clock_offset: float
+    ) -> VideoFrameTimings | None:
+        sampler = self._samplers[socket]
+        weight = sampler.sample(topic)
+        if not weight and not (sampler.enabled and self._inspect_unsampled):
+            return None
+
+        timings = VideoFrameTimings(message)
+        source = None
+        if weight:
+            self.metrics.messages.add(weight, self._attrs(socket=socket))
+            self._count_trace(message, socket, weight)
+            if self._sources:
+                source = self._track_source(timings, socket, weight)
+        self._measure_video_frame(timings, socket, bool(weight), clock_offset, source)
+        return timings if weight else None
+
+    def record_sink_message(
+        self,
+        timings: VideoFrameTimings | None,
+        topic: bytes,
+        size: int,
+        depths: QueueDepths,
+    ) -> None:
+        self._record_message(timings, topic, "Sink", size, depths)
+
+    def record_src_message(
+        self,
+        timings: VideoFrameTimings | None,
+        topic: bytes,
+        size: int,
+        depths: QueueDepths,
+    ) -> None:
+        self._record_message(timings, topic, "Source", size, depths)
 
-    def _add_message_measure(self, message: Message, socket: ZMQSocket) -> None:
-        self.metrics.messages.add(1, self._attrs(socket=socket))
-        self._count_trace(message, socket)
-        self._measure_video_frame(message, socket)
+    def _record_message(
+        self,
+        timings: VideoFrameTimings | None,
+        topic: bytes,
+        socket: ZMQSocket,
+        size: int,
+        depths: QueueDepths,
+    ) -> None:
+        if self.recorder is None or timings is None:
+            return
+        video_frame = timings.video_frame
+        source_id = video_frame.source_id if video_frame else None
+        enqueued, dequeued = depths
+        self.recorder.record(
+            (
+                time.time(),
+                socket,
+                topic,
+                source_id,
+                size,
+                enqueued,
+                dequeued,
+                timings.values,
+            )
+        )
+
+    def _track_source(
+        self, timings: VideoFrameTimings, socket: ZMQSocket, weight: int
+    ) -> str | None:
+        video_frame = timings.video_frame
+        if not video_frame:
+            return None
+        tracker = self._sources[socket]
+        source = tracker.track(video_frame.source_id, weight, time.monotonic())
+        self.metrics.source_messages.add(weight, self._source_attrs(socket, source))
+        return source
 
-    def _count_trace(self, message: Message, socket: ZMQSocket) -> None:
+    def _count_trace(self, message: Message, socket: ZMQSocket, weight: int) -> None:
         span = getattr(message, "span_context", None)
         context: dict[str, Any] | None = span.as_dict() if span else None
         if not context:
@@ -230,10 +848,25 @@ class Measurements:
             w3c_propagation=W3C_TRACE_HEADER in context,
             jaeger_propagation=JAEGER_TRACE_HEADER in context,
         )
-        self.metrics.traces.add(1, attributes=attrs)
+        self.metrics.traces.add(weight, attributes=attrs)
+
+    def _measure_video_frame(
+        self,
+        timings: VideoFrameTimings,
+        socket: ZMQSocket,
+        sampled: bool = True,
+        clock_offset: float = 0.0,
+        source: str | None = None,
+    ) -> None:
+        if self._samplers[socket].enabled:
+            if self._service != "Client" or socket != "Source":
+                if not timings.values:
+                    return
+            elif not sampled:
+                if timings.values:
+                    timings.clear()
+                return
 
-    def _measure_video_frame(self, message: Message, socket: ZMQSocket) -> None:
-        timings = VideoFrameTimings(message)
         match self._service, socket:
             case "Client", "Source":
                 timings.append_timing(LABEL_CLIENT_SOURCE, truncate=True)
@@ -244,71 +877,145 @@ class Measurements:
             case "Client", "Sink":
                 timings.append_timing(LABEL_CLIENT_SINK)
 
-        self._detect_video_frame_delay(timings)
+        self._detect_video_frame_delay(timings, socket, clock_offset, source)
 
-    def _detect_video_frame_delay(self, timings: VideoFrameTimings) -> None:
-        delay = timings.get_delay(LABEL_CLIENT_SOURCE, LABEL_SERVER_SINK)
-        if delay is not None:
-            self.metrics.delay.record(
-                delay, self._attrs(path_start="Client", path_end="Server")
-            )
-        delay = timings.get_delay(LABEL_SERVER_SINK, LABEL_SERVER_SOURCE)
-        if delay is not None:
-            self.metrics.delay.record(
-                delay, self._attrs(path_start="Server", path_end="Server")
-            )
-        delay = timings.get_delay(LABEL_SERVER_SOURCE, LABEL_CLIENT_SINK)
-        if delay is not None:
-            self.metrics.delay.record(
-                delay, self._attrs(path_start="Server", path_end="Client")
-            )
-        delay = timings.get_delay(LABEL_CLIENT_SOURCE, LABEL_CLIENT_SINK)
-        if delay is not None:
+    def _detect_video_frame_delay(
+        self,
+        timings: VideoFrameTimings,
+        socket: ZMQSocket,
+        clock_offset: float = 0.0,
+        source: str | None = None,
+    ) -> None:
+        for start_label, end_label, path_start, path_end in DELAY_PATHS:
+            delay = timings.get_delay(start_label, end_label)
+            if delay is None:
+                continue
+            if path_start != self._service:
+                delay += clock_offset
+            if path_end != self._service:
+                delay -= clock_offset
             self.metrics.delay.record(
-                delay, self._attrs(path_start="Client", path_end="Client")
+                delay, self._attrs(path_start=path_start, path_end=path_end)
             )
+            if source:
+                tracker = self._sources[socket]
+                tracker.track_delay(source, (path_start, path_end), delay)
+
+    def measure_source_queue_depth(
+        self, depth: int, timings: VideoFrameTimings | None = None
+    ) -> None:
+        tracker = self._sources.get("Source")
+        if tracker is None:
+            self.metrics.source_queue_depth.record(depth, self._attrs())
+            return
+        video_frame = timings.video_frame if timings else None
+        source = tracker.label(video_frame.source_id) if video_frame else OTHER_SOURCE
+        attrs = self._source_attrs("Source", source)
+        self.metrics.source_queue_depth.record(depth, attrs)
+
+    def measure_queue_residence_time(self, lane: Lane, residence: float) -> None:
+        self.metrics.queue_residence_time.record(residence, self._attrs(lane=lane))
+
+    def increment_shed_messages(
+        self, socket: ZMQSocket, reason: ShedReason, count: int = 1
+    ) -> None:
+        attrs = self._attrs(socket=socket, reason=reason)
+        self.metrics.shed_messages.add(count, attrs)
+
+    def measure_session_resumption(
+        self, replay_size: int, resume_time: float | None
+    ) -> None:
+        attrs = self._attrs()
+        self.metrics.session_replay_size.record(replay_size, attrs)
+        if resume_time is not None:
+            self.metrics.session_resume_time.record(resume_time, attrs)
+
+    def add_session_lost_frames(self, count: int) -> None:
+        self.metrics.session_lost_frames.add(count, self._attrs())
 
-    def measure_zmq_capacity(
+    def measure_spillover_size(self, size: int) -> None:
+        self.metrics.spillover_size.record(size, self._attrs())
+
+    def add_spillover_written(self, size: int) -> None:
+        self.metrics.spillover_written.add(size, self._attrs())
+
+    def add_spillover_drained(self, size: int) -> None:
+        self.metrics.spillover_drained.add(size, self._attrs())
+
+    def measure_stage(self, stage: Stage, duration: float) -> None:
+        self.metrics.stage_duration.record(duration, self._attrs(stage=stage))
+
+    def measure_loop_lag(self, lag: float) -> None:
+        self.metrics.loop_lag.record(lag, self._attrs())
+
+    def measure_clock_sync(self, offset: float, rtt: float) -> None:
+        attrs = self._attrs()
+        self.metrics.clock_offset.record(offset, attrs)
+        self.metrics.clock_rtt.record(rtt, attrs)
+
+    def observe_zmq_capacity(
         self, socket: NonBlockingReader | NonBlockingWriter
     ) -> None:
         match socket:
             case NonBlockingReader():
                 attrs = self._attrs(socket="Source")
-                consumed = socket.enqueued_results()
+                consumed = socket.enqueued_results
                 total = socket.results_queue_size
             case NonBlockingWriter():
                 attrs = self._attrs(socket="Sink")
-                consumed = socket.inflight_messages()
+                consumed = socket.inflight_messages
                 total = socket.max_inflight_messages
             case _:
                 return
 
-        self.metrics.consumed_zmq_capacity.record(consumed, attrs)
-        self.metrics.left_zmq_capacity.record(total - consumed, attrs)
+        self.metrics.add_zmq_capacity((attrs, consumed, total))
 
-    def measure_ws_reading_capacity(self, queue: Queue) -> None:
+    def measure_ws_reading_capacity(self, consumed: int, total: int) -> None:
         attrs = self._attrs(socket="Sink")
-        consumed = queue.qsize()
-        total = queue.maxsize
 
         self.metrics.consumed_ws_reading_capacity.record(consumed, attrs)
         self.metrics.left_ws_reading_capacity.record(total - consumed, attrs)
 
-    def measure_src_message_data(self, frame: bytes) -> None:
+    def measure_src_message_data(self, frame: bytes | memoryview) -> None:
         self._measure_message_data(frame, "Source")
 
-    def measure_sink_message_data(self, frame: bytes) -> None:
+    def measure_sink_message_data(self, frame: bytes | memoryview) -> None:
         self._measure_message_data(frame, "Sink")
 
-    def _measure_message_data(self, frame: bytes, socket: ZMQSocket) -> None:
+    def _measure_message_data(
+        self, frame: bytes | memoryview, socket: ZMQSocket
+    ) -> None:
         self.metrics.message_size.record(len(frame), self._attrs(socket=socket))
 
+    def measure_compression(
+        self,
+        original_size: int,
+        compressed_size: int,
+        cpu_time: float,
+        operation: CompressionOperation,
+    ) -> None:
+        attrs = self._attrs(operation=operation)
+        self.metrics.compression_ratio.record(original_size / compressed_size, attrs)
+        self.metrics.compression_time.record(cpu_time, attrs)
+
     def increment_ws_writing_pauses(self) -> None:
         self.metrics.ws_writing_pauses.add(1, self._attrs())
 
     def increment_ws_writing_resumed(self) -> None:
         self.metrics.ws_writing_resumed.add(1, self._attrs())
 
+    def increment_ws_reading_pauses(self) -> None:
+        self.metrics.ws_reading_pauses.add(1, self._attrs())
+
+    def increment_ws_reading_resumed(self) -> None:
+        self.metrics.ws_reading_resumed.add(1, self._attrs())
+
+    def increment_ws_credit_stalls(self) -> None:
+        self.metrics.ws_credit_stalls.add(1, self._attrs())
+
+    def increment_ws_route_misses(self) -> None:
+        self.metrics.ws_route_misses.add(1, self._attrs())
+
     def increment_ws_connection_attempts(self) -> None:
         self.metrics.ws_connection_attempts.add(1, self._attrs())
 
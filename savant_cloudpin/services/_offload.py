@@ -0,0 +1,47 @@
+import asyncio
+import sys
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from savant_cloudpin.cfg import SerializationConfig
+
+
+class OrderedOffload[T]:
+    def __init__(self, executor: ThreadPoolExecutor, max_pending: int) -> None:
+        self._executor = executor
+        self.max_pending = max_pending
+        self._pending = deque[asyncio.Future[T]]()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def is_full(self) -> bool:
+        return len(self._pending) >= self.max_pending
+
+    def submit[*Ts](self, func: Callable[[*Ts], T], *args: *Ts) -> None:
+        loop = asyncio.get_running_loop()
+        self._pending.append(loop.run_in_executor(self._executor, func, *args))
+
+    def put(self, value: T) -> None:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._pending.append(future)
+
+    async def next(self) -> T | None:
+        if not self._pending:
+            return None
+        return await self._pending.popleft()
+
+
+def is_gil_enabled() -> bool:
+    check = getattr(sys, "_is_gil_enabled", None)
+    return check() if check else True
+
+
+def create_executor(config: SerializationConfig) -> ThreadPoolExecutor | None:
+    if config.workers < 0:
+        raise ValueError("Serialization workers number must not be negative")
+    if not config.workers:
+        return None
+    return ThreadPoolExecutor(config.workers, thread_name_prefix="cloudpin-serde")
@@ -1,12 +1,44 @@
+import json
+import time
 from struct import Struct
-from typing import NamedTuple
+from typing import Any, Final, NamedTuple
 
 from savant_rs.utils import serialization
 from savant_rs.utils.serialization import Message
 
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
 FRAME_HEAD_SIZE = 8
 FRAME_HEAD_FORMAT = Struct("<ll")
+BATCH_HEAD_SIZE = 8
+BATCH_HEAD_FORMAT = Struct("<ll")
+BATCH_MARKER = -1
+RECORD_HEAD_SIZE = 4
+RECORD_HEAD_FORMAT = Struct("<l")
+COMPRESSED_HEAD_SIZE = 8
+COMPRESSED_HEAD_FORMAT = Struct("<ll")
+COMPRESSED_MARKER = -2
+SEQUENCED_HEAD_SIZE = 12
+SEQUENCED_HEAD_FORMAT = Struct("<lq")
+SEQUENCED_MARKER = -3
 API_KEY_HEADER = "x-api-key"
+COMPRESSION_HEADER = "x-cloudpin-compression"
+FLOW_CONTROL_HEADER = "x-cloudpin-flow-control"
+CREDITS_FLOW_CONTROL = "credits"
+CREDIT_CONTROL = "credit"
+SESSION_HEADER = "x-cloudpin-session"
+SESSION_ACK_HEADER = "x-cloudpin-session-ack"
+ACK_CONTROL = "ack"
+CLOCK_SYNC_HEADER = "x-cloudpin-clock-sync"
+NTP_CLOCK_SYNC = "ntp"
+PING_CONTROL = "ping"
+PONG_CONTROL = "pong"
+
+CODEC_IDS: Final = {"zstd": 1}
+SUPPORTED_CODECS: Final = ("zstd",) if zstd else ()
 
 
 class FrameData(NamedTuple):
@@ -15,22 +47,189 @@ class FrameData(NamedTuple):
     extra: bytes
 
 
-def pack_stream_frame(topic: bytes, message: Message, extra: bytes | None) -> bytes:
-    body = serialization.save_message_to_bytes(message)
-    extra = extra or b""
+class RawRecord(NamedTuple):
+    topic: bytes
+    body: bytes
+    extra: bytes
+
+
+class FrameBatch:
+    def __init__(
+        self, max_messages: int = 1, max_bytes: int = 0, capacity: int = 65536
+    ) -> None:
+        self.max_messages = max(1, max_messages)
+        self.max_bytes = max_bytes
+        self.size = BATCH_HEAD_SIZE
+        self.started = 0.0
+        self._count = 0
+        self._buffer = bytearray(max(capacity, BATCH_HEAD_SIZE))
+        self._view: memoryview | None = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def is_full(self) -> bool:
+        if self._count >= self.max_messages:
+            return True
+        return bool(self.max_bytes and self.size >= self.max_bytes)
+
+    def linger_left(self, linger: float) -> float:
+        if not self._count:
+            return linger
+        return self.started + linger - time.monotonic()
+
+    def _reserve(self, size: int) -> None:
+        missing = size - len(self._buffer)
+        if missing > 0:
+            self._buffer.extend(bytes(max(missing, len(self._buffer))))
+
+    def append_record(self, record: RawRecord) -> None:
+        topic, body, extra = record
+        frame_size = FRAME_HEAD_SIZE + len(topic) + len(body) + len(extra)
+        end = self.size + RECORD_HEAD_SIZE + frame_size
+        self._reserve(end)
+
+        buffer = self._buffer
+        idx = self.size
+        RECORD_HEAD_FORMAT.pack_into(buffer, idx, frame_size)
+        idx += RECORD_HEAD_SIZE
+        FRAME_HEAD_FORMAT.pack_into(buffer, idx, len(topic), len(body))
+        idx += FRAME_HEAD_SIZE
+        for part in (topic, body, extra):
+            buffer[idx : idx + len(part)] = part
+            idx += len(part)
+
+        if not self._count:
+            self.started = time.monotonic()
+        self._count += 1
+        self.size = end
+
+    def pack(self) -> memoryview:
+        if self._count == 1:
+            start = BATCH_HEAD_SIZE + RECORD_HEAD_SIZE
+        else:
+            start = 0
+            BATCH_HEAD_FORMAT.pack_into(self._buffer, 0, BATCH_MARKER, self._count)
+        self._view = memoryview(self._buffer)[start : self.size]
+        return self._view
+
+    def clear(self) -> None:
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        self._count = 0
+        self.size = BATCH_HEAD_SIZE
+        self.started = 0.0
+
+
+class FrameCompressor:
+    def __init__(self, codec: str, level: int, min_size: int) -> None:
+        if codec not in SUPPORTED_CODECS:
+            raise ValueError(f"Unsupported compression codec '{codec}'")
+        assert zstd
+        self.codec = codec
+        self.min_size = min_size
+        self._head = COMPRESSED_HEAD_FORMAT.pack(COMPRESSED_MARKER, CODEC_IDS[codec])
+        self._compressor = zstd.ZstdCompressor(level=level)
+
+    def compress(self, frame: bytes | memoryview) -> bytes | None:
+        if len(frame) < self.min_size:
+            return None
+        assert zstd
+        body = self._compressor.compress(frame, zstd.ZstdCompressor.FLUSH_FRAME)
+        return b"".join([self._head, body])
+
+
+def parse_codecs(header: str | None) -> tuple[str, ...]:
+    if not header:
+        return ()
+    return tuple(codec.strip() for codec in header.split(",") if codec.strip())
+
+
+def is_compressed_frame(payload: bytes | memoryview) -> bool:
+    marker, _ = COMPRESSED_HEAD_FORMAT.unpack_from(payload)
+    return marker == COMPRESSED_MARKER
+
+
+def decompress_stream_frame(payload: bytes | memoryview) -> bytes:
+    _, codec_id = COMPRESSED_HEAD_FORMAT.unpack_from(payload)
+    match codec_id:
+        case 1 if zstd:
+            return zstd.decompress(memoryview(payload)[COMPRESSED_HEAD_SIZE:])
+        case _:
+            raise ValueError(f"Unsupported stream frame codec {codec_id}")
+
+
+def pack_control(kind: str, **fields: Any) -> bytes:
+    return json.dumps({"type": kind, **fields}).encode()
+
+
+def unpack_control(payload: str) -> dict[str, Any]:
+    control = json.loads(payload)
+    if not isinstance(control, dict) or "type" not in control:
+        raise ValueError("Invalid control message")
+    return control
+
+
+def pack_sequenced_frame(seq: int, frame: bytes | memoryview) -> bytes:
+    return b"".join([SEQUENCED_HEAD_FORMAT.pack(SEQUENCED_MARKER, seq), frame])
+
+
+def split_sequenced_frame(payload: memoryview) -> tuple[int | None, memoryview]:
+    (marker,) = RECORD_HEAD_FORMAT.unpack_from(payload)
+    if marker != SEQUENCED_MARKER:
+        return None, payload
+    _, seq = SEQUENCED_HEAD_FORMAT.unpack_from(payload)
+    return seq, payload[SEQUENCED_HEAD_SIZE:]
+
+
+def pack_record(record: RawRecord) -> bytes:
+    topic, body, extra = record
     head = FRAME_HEAD_FORMAT.pack(len(topic), len(body))
     return b"".join([head, topic, body, extra])
 
 
-def unpack_stream_frame(payload: bytes) -> FrameData:
+def split_stream_frame(payload: memoryview) -> RawRecord:
     topic_size, body_size = FRAME_HEAD_FORMAT.unpack_from(payload)
     topic_idx = FRAME_HEAD_SIZE
     body_idx = topic_idx + topic_size
     extra_idx = body_idx + body_size
 
-    topic = payload[topic_idx:body_idx]
-    body = payload[body_idx:extra_idx]
-    extra = payload[extra_idx:]
+    topic = bytes(payload[topic_idx:body_idx])
+    body = bytes(payload[body_idx:extra_idx])
+    extra = bytes(payload[extra_idx:])
+    return RawRecord(topic, body, extra)
+
+
+def split_batch_frame(payload: memoryview) -> list[RawRecord]:
+    _, count = BATCH_HEAD_FORMAT.unpack_from(payload)
+    result = list[RawRecord]()
+    idx = BATCH_HEAD_SIZE
+    for _ in range(count):
+        (frame_size,) = RECORD_HEAD_FORMAT.unpack_from(payload, idx)
+        idx += RECORD_HEAD_SIZE
+        result.append(split_stream_frame(payload[idx : idx + frame_size]))
+        idx += frame_size
+    return result
+
+
+def split_stream_frames(payload: bytes | memoryview) -> list[RawRecord]:
+    view = memoryview(payload)
+    marker, _ = BATCH_HEAD_FORMAT.unpack_from(view)
+    if marker == BATCH_MARKER:
+        return split_batch_frame(view)
+    if marker == COMPRESSED_MARKER:
+        return split_stream_frames(decompress_stream_frame(view))
+    if marker == SEQUENCED_MARKER:
+        raise ValueError("Sequenced stream frame must be split by its session")
+    return [split_stream_frame(view)]
+
+
+def dump_record(topic: bytes, message: Message, extra: bytes | None) -> RawRecord:
+    body = serialization.save_message_to_bytes(message)
+    return RawRecord(topic, body, extra or b"")
+
 
-    msg = serialization.load_message_from_bytes(body)
-    return FrameData(topic, msg, extra)
+def load_record(record: RawRecord) -> FrameData:
+    msg = serialization.load_message_from_bytes(record.body)
+    return FrameData(record.topic, msg, record.extra)
@@ -0,0 +1,177 @@
+import time
+from collections import deque
+from typing import NamedTuple
+
+from savant_rs.utils.serialization import Message
+
+from savant_cloudpin.cfg import SchedulingConfig
+from savant_cloudpin.services._measuring import Lane
+from savant_cloudpin.services._protocol import RawRecord
+from savant_cloudpin.services._video_frame import VideoFrameTimings
+
+SCHEDULING_POLICIES = ("fifo", "drr")
+MESSAGE_TYPES = (
+    "video_frame",
+    "video_frame_update",
+    "video_frame_batch",
+    "end_of_stream",
+    "shutdown",
+    "user_data",
+    "unknown",
+)
+
+
+class QueuedRecord(NamedTuple):
+    record: RawRecord
+    lane: Lane
+    enqueued: float
+    expires: float = 0.0
+    depth: int = 0
+    timings: VideoFrameTimings | None = None
+
+
+class SourceQueue:
+    __slots__ = ("deficit", "items", "quantum")
+
+    def __init__(self, quantum: float) -> None:
+        self.items = deque[QueuedRecord]()
+        self.quantum = quantum
+        self.deficit = 0.0
+
+
+class FifoScheduler:
+    def __init__(self) -> None:
+        self._items = deque[QueuedRecord]()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def push(self, item: QueuedRecord) -> int:
+        self._items.append(item)
+        return 0
+
+    def pop(self) -> QueuedRecord | None:
+        return self._items.popleft() if self._items else None
+
+    def take(self, topic: bytes) -> list[QueuedRecord]:
+        taken = [item for item in self._items if item.record.topic == topic]
+        if taken:
+            self._items = deque(i for i in self._items if i.record.topic != topic)
+        return taken
+
+
+class FairScheduler:
+    def __init__(self, quantum: int, weights: dict[str, float]) -> None:
+        self.quantum = quantum
+        self.weights = weights
+        self._queues = dict[bytes, SourceQueue]()
+        self._active = deque[SourceQueue]()
+        self._pending = 0
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def depth(self, topic: bytes) -> int:
+        queue = self._queues.get(topic)
+        return len(queue.items) if queue else 0
+
+    def push(self, item: QueuedRecord) -> int:
+        topic = item.record.topic
+        queue = self._queues.get(topic)
+        if queue is None:
+            weight = self.weights.get(topic.decode(errors="replace"), 1.0)
+            queue = self._queues[topic] = SourceQueue(self.quantum * weight)
+            self._active.append(queue)
+        queue.items.append(item)
+        self._pending += 1
+        return len(queue.items)
+
+    def pop(self) -> QueuedRecord | None:
+        while self._active:
+            queue = self._active[0]
+            item = queue.items[0]
+            topic, body, extra = item.record
+            cost = len(topic) + len(body) + len(extra)
+            if queue.deficit < cost:
+                queue.deficit += queue.quantum
+                self._active.rotate(-1)
+                continue
+
+            queue.deficit -= cost
+            queue.items.popleft()
+            self._pending -= 1
+            if not queue.items:
+                self._active.popleft()
+                del self._queues[topic]
+            return item
+        return None
+
+    def take(self, topic: bytes) -> list[QueuedRecord]:
+        queue = self._queues.pop(topic, None)
+        if queue is None:
+            return []
+        self._active.remove(queue)
+        self._pending -= len(queue.items)
+        return list(queue.items)
+
+
+class OutboundScheduler:
+    def __init__(self, config: SchedulingConfig) -> None:
+        if config.policy not in SCHEDULING_POLICIES:
+            raise ValueError(f"Unsupported scheduling policy '{config.policy}'")
+        unknown_types = set(config.priority_types) - set(MESSAGE_TYPES)
+        if unknown_types:
+            raise ValueError(f"Unsupported priority message types {unknown_types}")
+        if config.quantum <= 0 or any(w <= 0 for w in config.weights.values()):
+            raise ValueError("Scheduling quantum and weights must be positive")
+
+        self.max_pending = max(1, config.max_pending)
+        self.bulk: FairScheduler | FifoScheduler
+        if config.policy == "drr":
+            self.bulk = FairScheduler(config.quantum, dict(config.weights))
+        else:
+            self.bulk = FifoScheduler()
+        self.priority = deque[QueuedRecord]()
+        self._priority_checks = [f"is_{kind}" for kind in config.priority_types]
+
+    def __len__(self) -> int:
+        return len(self.priority) + len(self.bulk)
+
+    def is_full(self) -> bool:
+        return len(self) >= self.max_pending
+
+    def is_priority(self, message: Message) -> bool:
+        return any(getattr(message, check)() for check in self._priority_checks)
+
+    def push(
+        self,
+        record: RawRecord,
+        priority: bool,
+        max_age: float = 0.0,
+        timings: VideoFrameTimings | None = None,
+    ) -> int:
+        enqueued = time.monotonic()
+        expires = enqueued + max_age if max_age else 0.0
+        depth = len(self)
+        if priority:
+            self.priority.extend(self.bulk.take(record.topic))
+            self.priority.append(
+                QueuedRecord(record, "Priority", enqueued, expires, depth, timings)
+            )
+            return 0
+        item = QueuedRecord(record, "Bulk", enqueued, expires, depth, timings)
+        return self.bulk.push(item)
+
+    def pop(self) -> QueuedRecord | None:
+        if self.priority:
+            return self.priority.popleft()
+        return self.bulk.pop()
+
+
+def create_scheduler(
+    config: SchedulingConfig, buffered: bool = False
+) -> OutboundScheduler | None:
+    scheduler = OutboundScheduler(config)
+    if config.policy == "fifo" and not config.priority_types and not buffered:
+        return None
+    return scheduler
@@ -8,13 +8,26 @@ from ssl import SSLContext
 from typing import override
 from urllib.parse import urlparse
 
-from picows import WSListener, WSUpgradeRequest, ws_create_server
+from picows import (
+    WSUpgradeRequest,
+    WSUpgradeResponse,
+    WSUpgradeResponseWithListener,
+    ws_create_server,
+)
 from savant_rs.py.log import get_logger
 
 from savant_cloudpin.cfg import ServerServiceConfig
-from savant_cloudpin.services._base import PumpServiceBase
+from savant_cloudpin.services._base import PumpServiceBase, ServiceConnection
 from savant_cloudpin.services._measuring import Measurements
-from savant_cloudpin.services._protocol import API_KEY_HEADER
+from savant_cloudpin.services._protocol import (
+    API_KEY_HEADER,
+    CLOCK_SYNC_HEADER,
+    COMPRESSION_HEADER,
+    FLOW_CONTROL_HEADER,
+    SESSION_ACK_HEADER,
+    SESSION_HEADER,
+)
+from savant_cloudpin.services._session import Session
 
 logger = get_logger(__package__ or __name__)
 
@@ -30,6 +43,7 @@ class ServerService(PumpServiceBase["ServerService"]):
         self._port = int(netloc.pop() if netloc else default_port)
         self._ssl = config.websockets.ssl
         self._api_key = config.websockets.api_key
+        self._max_connections = config.websockets.max_clients
 
     @cached_property
     def _ssl_context(self) -> SSLContext | None:
@@ -46,14 +60,50 @@ class ServerService(PumpServiceBase["ServerService"]):
             logger.warning("Continue without client certificate authentication")
         return ctx
 
-    def _authenticate_listener(self, request: WSUpgradeRequest) -> WSListener:
+    def _authenticate_listener(
+        self, request: WSUpgradeRequest
+    ) -> WSUpgradeResponseWithListener:
         self._measurements.increment_ws_connection_attempts()
 
         client_api_key = request.headers.get(API_KEY_HEADER, None)
         if self._api_key != client_api_key:
             self._measurements.increment_ws_connection_errors()
             raise ConnectionRefusedError("Invalid API key")
-        return self._create_listener()
+
+        headers = self._negotiation_headers()
+        listener = self._create_listener()
+        self._open_session(listener, request, headers)
+        listener.negotiate_compression(request.headers.get(COMPRESSION_HEADER, None))
+        listener.negotiate_flow_control(request.headers.get(FLOW_CONTROL_HEADER, None))
+        listener.negotiate_clock_sync(request.headers.get(CLOCK_SYNC_HEADER, None))
+        response = WSUpgradeResponse.create_101_response(extra_headers=headers)
+        return WSUpgradeResponseWithListener(response, listener)
+
+    def _open_session(
+        self,
+        listener: ServiceConnection,
+        request: WSUpgradeRequest,
+        headers: dict[str, str],
+    ) -> None:
+        session_id = request.headers.get(SESSION_HEADER, None)
+        if not self._session.enabled or not session_id:
+            return
+        try:
+            peer_ack = int(request.headers.get(SESSION_ACK_HEADER, 0))
+        except ValueError as orig_err:
+            self._measurements.increment_ws_connection_errors()
+            raise ConnectionRefusedError(
+                "Invalid session acknowledgement"
+            ) from orig_err
+
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = Session(session_id, self._session.replay_bytes, peer_ack + 1)
+            self._sessions[session_id] = session
+        listener.session = session
+        listener.peer_ack = peer_ack
+        headers[SESSION_HEADER] = session_id
+        headers[SESSION_ACK_HEADER] = str(session.last_received)
 
     @asynccontextmanager
     async def _create_server(self) -> AsyncGenerator[Server]:
@@ -78,6 +128,8 @@ class ServerService(PumpServiceBase["ServerService"]):
 
                 self.started.set()
                 loops = [self._inbound_ws_loop, self._outbound_ws_loop]
+                if self._loop_monitor.enabled:
+                    loops.append(self._loop_monitor_loop)
                 tasks = [asyncio.create_task(loop()) for loop in loops]
                 await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
                 self.stop_running()
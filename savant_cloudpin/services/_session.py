@@ -0,0 +1,83 @@
+import time
+import uuid
+from collections import deque
+from typing import TYPE_CHECKING
+
+from savant_cloudpin.services._protocol import pack_sequenced_frame
+
+if TYPE_CHECKING:
+    from savant_cloudpin.services._base import ServiceConnection
+
+
+class Session:
+    def __init__(self, session_id: str, replay_bytes: int, next_seq: int = 1) -> None:
+        self.id = session_id
+        self.replay_bytes = replay_bytes
+        self.next_seq = next_seq
+        self.last_received = 0
+        self.unacked = 0
+        self.last_ack = time.monotonic()
+        self.ring = deque[tuple[int, bytes, int]]()
+        self.ring_size = 0
+        self.connection: ServiceConnection | None = None
+        self.established = False
+        self.detached_at = time.monotonic()
+        self.topics = list[bytes]()
+
+    @classmethod
+    def create(cls, replay_bytes: int) -> "Session":
+        return cls(uuid.uuid4().hex, replay_bytes)
+
+    def is_expired(self, grace: float, now: float) -> bool:
+        return self.connection is None and now - self.detached_at > grace
+
+    def attach(self, connection: "ServiceConnection") -> float | None:
+        resumed = self.established
+        self.connection = connection
+        self.established = True
+        return time.monotonic() - self.detached_at if resumed else None
+
+    def detach(self, topics: list[bytes]) -> None:
+        self.connection = None
+        self.detached_at = time.monotonic()
+        self.topics = topics
+
+    def sequence(self, frame: bytes | memoryview, messages: int = 1) -> bytes:
+        seq = self.next_seq
+        self.next_seq += 1
+        data = pack_sequenced_frame(seq, frame)
+        self.ring.append((seq, data, messages))
+        self.ring_size += len(data)
+        while self.ring_size > self.replay_bytes and self.ring:
+            _, evicted, _ = self.ring.popleft()
+            self.ring_size -= len(evicted)
+        return data
+
+    def acknowledge(self, seq: int) -> None:
+        while self.ring and self.ring[0][0] <= seq:
+            _, data, _ = self.ring.popleft()
+            self.ring_size -= len(data)
+
+    def receive(self, seq: int) -> int | None:
+        if seq <= self.last_received:
+            return None
+        missed = seq - self.last_received - 1
+        self.last_received = seq
+        self.unacked += 1
+        return missed
+
+    def needs_ack(self, frames: int, interval: float, now: float) -> bool:
+        if not self.unacked:
+            return False
+        return self.unacked >= frames or now - self.last_ack >= interval
+
+    def mark_acked(self, now: float) -> None:
+        self.unacked = 0
+        self.last_ack = now
+
+    def replay(self, peer_ack: int) -> list[bytes]:
+        self.acknowledge(peer_ack)
+        return [data for _, data, _ in self.ring]
+
+    def pending_messages(self) -> int:
+        return sum(messages for _, _, messages in self.ring)
@@ -0,0 +1,180 @@
+import mmap
+import os
+import time
+from collections import Counter
+from struct import Struct
+
+from savant_cloudpin.services._protocol import (
+    FRAME_HEAD_FORMAT,
+    FRAME_HEAD_SIZE,
+    RawRecord,
+    pack_record,
+    split_stream_frame,
+)
+
+SPILL_MAGIC = b"CPSPILL1"
+SPILL_HEAD_SIZE = 40
+SPILL_HEAD_FORMAT = Struct("<8sQQQQ")
+ENTRY_HEAD_SIZE = 12
+ENTRY_HEAD_FORMAT = Struct("<Id")
+WRAP_MARKER = 0xFFFFFFFF
+
+
+class SpillRing:
+    def __init__(self, path: str, max_bytes: int, max_age: float) -> None:
+        if max_bytes <= ENTRY_HEAD_SIZE:
+            raise ValueError("Spillover buffer size is too small")
+        self.capacity = max_bytes
+        self.max_age = max_age
+        self.head = 0
+        self.tail = 0
+        self.used = 0
+        self.count = 0
+        self.evicted = 0
+        self.expired = 0
+        self.topics = Counter[bytes]()
+
+        file_size = SPILL_HEAD_SIZE + max_bytes
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            resized = os.fstat(fd).st_size != file_size
+            if resized:
+                os.ftruncate(fd, file_size)
+            self._mmap = mmap.mmap(fd, file_size)
+        finally:
+            os.close(fd)
+        if resized:
+            self._store_head()
+        else:
+            self._load_head()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _load_head(self) -> None:
+        magic, head, tail, used, count = SPILL_HEAD_FORMAT.unpack_from(self._mmap)
+        valid = head < self.capacity and tail < self.capacity
+        if magic == SPILL_MAGIC and valid and used <= self.capacity:
+            self.head, self.tail, self.used, self.count = head, tail, used, count
+            self._load_topics()
+        else:
+            self._store_head()
+
+    def _load_topics(self) -> None:
+        head = self.head
+        for _ in range(self.count):
+            if self.capacity - head < ENTRY_HEAD_SIZE:
+                head = 0
+            length, _ = ENTRY_HEAD_FORMAT.unpack_from(
+                self._mmap, SPILL_HEAD_SIZE + head
+            )
+            if length == WRAP_MARKER:
+                head = 0
+                length, _ = ENTRY_HEAD_FORMAT.unpack_from(self._mmap, SPILL_HEAD_SIZE)
+            self.topics[self._topic_at(SPILL_HEAD_SIZE + head + ENTRY_HEAD_SIZE)] += 1
+            head = (head + ENTRY_HEAD_SIZE + length) % self.capacity
+
+    def _topic_at(self, idx: int) -> bytes:
+        topic_size, _ = FRAME_HEAD_FORMAT.unpack_from(self._mmap, idx)
+        idx += FRAME_HEAD_SIZE
+        return self._mmap[idx : idx + topic_size]
+
+    def _release_topic(self, topic: bytes) -> None:
+        self.topics[topic] -= 1
+        if self.topics[topic] <= 0:
+            del self.topics[topic]
+
+    def has_topic(self, topic: bytes) -> bool:
+        return topic in self.topics
+
+    def _store_head(self) -> None:
+        SPILL_HEAD_FORMAT.pack_into(
+            self._mmap, 0, SPILL_MAGIC, self.head, self.tail, self.used, self.count
+        )
+
+    def fill(self) -> float:
+        return self.used / self.capacity
+
+    def _wrap_waste(self, offset: int, size: int) -> int:
+        left = self.capacity - offset
+        return left if left < size else 0
+
+    def push(self, record: RawRecord) -> bool:
+        payload = pack_record(record)
+        size = ENTRY_HEAD_SIZE + len(payload)
+        if size > self.capacity:
+            return False
+
+        while self.count:
+            waste = self._wrap_waste(self.tail, size)
+            if self.used + waste + size <= self.capacity:
+                break
+            self._discard()
+            self.evicted += 1
+        if not self.count:
+            self.head = self.tail = self.used = 0
+
+        if waste := self._wrap_waste(self.tail, size):
+            if waste >= ENTRY_HEAD_SIZE:
+                ENTRY_HEAD_FORMAT.pack_into(
+                    self._mmap, SPILL_HEAD_SIZE + self.tail, WRAP_MARKER, 0.0
+                )
+            self.used += waste
+            self.tail = 0
+
+        idx = SPILL_HEAD_SIZE + self.tail
+        ENTRY_HEAD_FORMAT.pack_into(self._mmap, idx, len(payload), time.time())
+        idx += ENTRY_HEAD_SIZE
+        self._mmap[idx : idx + len(payload)] = payload
+        self.tail = (self.tail + size) % self.capacity
+        self.used += size
+        self.count += 1
+        self.topics[record.topic] += 1
+        self._store_head()
+        return True
+
+    def _read_entry(self) -> tuple[float, int, int]:
+        left = self.capacity - self.head
+        if left < ENTRY_HEAD_SIZE:
+            self.used -= left
+            self.head = 0
+        idx = SPILL_HEAD_SIZE + self.head
+        length, stored = ENTRY_HEAD_FORMAT.unpack_from(self._mmap, idx)
+        if length == WRAP_MARKER:
+            self.used -= self.capacity - self.head
+            self.head = 0
+            idx = SPILL_HEAD_SIZE
+            length, stored = ENTRY_HEAD_FORMAT.unpack_from(self._mmap, idx)
+        return stored, idx + ENTRY_HEAD_SIZE, length
+
+    def _discard(self) -> None:
+        _, idx, length = self._read_entry()
+        self._release_topic(self._topic_at(idx))
+        self._advance(ENTRY_HEAD_SIZE + length)
+
+    def _advance(self, size: int) -> None:
+        self.head = (self.head + size) % self.capacity
+        self.used -= size
+        self.count -= 1
+        if not self.count:
+            self.head = self.tail = self.used = 0
+            self.topics.clear()
+
+    def pop(self) -> RawRecord | None:
+        while self.count:
+            stored, idx, length = self._read_entry()
+            record = None
+            if not self.max_age or time.time() - stored <= self.max_age:
+                record = split_stream_frame(memoryview(self._mmap[idx : idx + length]))
+                self._release_topic(record.topic)
+            else:
+                self._release_topic(self._topic_at(idx))
+            self._advance(ENTRY_HEAD_SIZE + length)
+            self._store_head()
+            if record:
+                return record
+            self.expired += 1
+        return None
+
+    def flush(self) -> None:
+        self._mmap.flush()
@@ -1,9 +1,9 @@
 import itertools
-from datetime import datetime, timezone
+from datetime import UTC, datetime
 from functools import cached_property
 from typing import Final, Literal
 
-from savant_rs.primitives import Attribute, AttributeValue
+from savant_rs.primitives import Attribute, AttributeValue, VideoFrame
 from savant_rs.utils.serialization import Message
 
 ATTR_NS: Final = "CloudPin"
@@ -29,9 +29,13 @@ class VideoFrameTimings:
         if "values" in self.__dict__:
             del self.__dict__["values"]
 
+    @cached_property
+    def video_frame(self) -> VideoFrame | None:
+        return self.message.as_video_frame()
+
     @cached_property
     def values(self) -> dict[str, float] | None:
-        video_frame = self.message.as_video_frame()
+        video_frame = self.video_frame
         timings = video_frame.get_attribute(ATTR_NS, ATTR) if video_frame else None
         if not timings or not timings.values:
             return None
@@ -49,7 +53,7 @@ class VideoFrameTimings:
         }
 
     def append_timing(self, label: ValueLabel, truncate: bool = False) -> None:
-        video_frame = self.message.as_video_frame()
+        video_frame = self.video_frame
         if not video_frame:
             return
 
@@ -58,7 +62,7 @@ class VideoFrameTimings:
             timings = Attribute(ATTR_NS, ATTR, [], None)
 
         values = timings.values
-        timestamp = datetime.now(timezone.utc).timestamp()
+        timestamp = datetime.now(UTC).timestamp()
         values.append(AttributeValue.string(label))
         values.append(AttributeValue.float(timestamp))
 
@@ -66,6 +70,20 @@ class VideoFrameTimings:
         video_frame.set_attribute(timings)
         self.reset_cache()
 
+    def clear(self) -> None:
+        video_frame = self.video_frame
+        if video_frame:
+            video_frame.delete_attribute(ATTR_NS, ATTR)
+        self.reset_cache()
+
+    def get_age(self, label: ValueLabel) -> float | None:
+        if not self.values:
+            return None
+        start = self.values.get(label, None)
+        if start is None:
+            return None
+        return datetime.now(UTC).timestamp() - start
+
     def get_delay(self, start_label: ValueLabel, end_label: ValueLabel) -> float | None:
         if not self.values:
             return None
@@ -0,0 +1,50 @@
+import sys
+import threading
+import time
+import traceback
+
+from savant_rs.py.log import get_logger
+
+logger = get_logger(__package__ or __name__)
+
+
+class LoopWatchdog:
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self.deadline = time.monotonic()
+        self.reported = 0.0
+        self._loop_thread = threading.get_ident()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+
+    def start(self) -> None:
+        self._loop_thread = threading.get_ident()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def expect(self, deadline: float) -> None:
+        self.deadline = deadline
+
+    def check(self, now: float) -> str | None:
+        deadline = self.deadline
+        if self.reported == deadline or now - deadline < self.threshold:
+            return None
+        self.reported = deadline
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return None
+        return "".join(traceback.format_stack(frame))
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.threshold / 2):
+            if stack := self.check(time.monotonic()):
+                logger.warning(
+                    f"Event loop is blocked for more than {self.threshold} sec.:\n"
+                    f"{stack}"
+                )
@@ -1,7 +1,11 @@
+import asyncio
+import threading
+from asyncio import AbstractEventLoop, Future
 from contextlib import AbstractContextManager
 from typing import override
 
 from savant_rs import zmq
+from savant_rs.py.log import get_logger
 from savant_rs.utils.serialization import Message
 from savant_rs.zmq import (
     ReaderResultMessage,
@@ -16,11 +20,70 @@ type ReaderResult = (
     ReaderResultMessage | ReaderResultTimeout | ReaderResultPrefixMismatch
 )
 
+logger = get_logger(__package__ or __name__)
+
+
+def _resolve[T](future: Future[T], result: T | None, error: Exception | None) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)  # type: ignore
+
 
 class NonBlockingReader(AbstractContextManager["NonBlockingReader"]):
     def __init__(self, config: zmq.ReaderConfig, results_queue_size: int) -> None:
         self._reader = zmq.NonBlockingReader(config, results_queue_size)
         self.results_queue_size = results_queue_size
+        self._receive_requested = threading.Event()
+        self._receiving: Future[ReaderResult] | None = None
+        self._receiver: threading.Thread | None = None
+
+    def _receive_forever(self, loop: AbstractEventLoop) -> None:
+        while self._receive_requested.wait():
+            self._receive_requested.clear()
+            receiving = self._receiving
+            if self.is_shutdown() or loop.is_closed() or not receiving:
+                return
+            try:
+                result, error = self._reader.receive(), None
+            except RuntimeError as err:
+                result, error = None, err
+            except Exception as err:
+                logger.exception("Unexpected ZeroMQ reader error")
+                result, error = None, err
+            if loop.is_closed():
+                return
+            loop.call_soon_threadsafe(_resolve, receiving, result, error)
+
+    def _start_receiving(self) -> Future[ReaderResult]:
+        loop = asyncio.get_running_loop()
+        self._receiving = loop.create_future()
+        if not self._receiver or not self._receiver.is_alive():
+            self._receiver = threading.Thread(
+                target=self._receive_forever,
+                args=(loop,),
+                name="zmq-reader-waiter",
+                daemon=True,
+            )
+            self._receiver.start()
+        self._receive_requested.set()
+        return self._receiving
+
+    async def receive_async(self, timeout: float) -> ReaderResult | None:
+        if not self._receiving:
+            if (result := self.try_receive()) or timeout <= 0:
+                return result
+            self._start_receiving()
+        assert self._receiving
+        if not self._receiving.done() and timeout > 0:
+            await asyncio.wait([self._receiving], timeout=timeout)
+        if not self._receiving.done():
+            return None
+
+        receiving, self._receiving = self._receiving, None
+        return receiving.result()
 
     def enqueued_results(self) -> int:
         return self._reader.enqueued_results()
@@ -39,6 +102,7 @@ class NonBlockingReader(AbstractContextManager["NonBlockingReader"]):
 
     def shutdown(self) -> None:
         self._reader.shutdown()
+        self._receive_requested.set()
 
     def try_receive(self) -> ReaderResult | None:
         return self._reader.try_receive()
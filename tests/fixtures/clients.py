@@ -60,6 +60,20 @@ def var_client_config(
     )
 
 
+@pytest.fixture
+def second_client_config(
+    second_client_zmq_src_config: ZMQReaderConfig,
+    second_client_zmq_sink_config: ZMQWriterConfig,
+    client_ws_config: ClientWSConfig,
+) -> ClientServiceConfig:
+    return ClientServiceConfig(
+        io_timeout=0.01,
+        websockets=client_ws_config,
+        zmq_src=second_client_zmq_src_config,
+        zmq_sink=second_client_zmq_sink_config,
+    )
+
+
 @pytest_asyncio.fixture
 async def client(
     client_config: ClientServiceConfig,
@@ -155,3 +155,61 @@ def var_zmq_src_config(var_zmq_src_endpoint: str) -> ZMQReaderConfig:
     return ZMQReaderConfig(
         results_queue_size=1000, endpoint=var_zmq_src_endpoint, receive_timeout=1000
     )
+
+
+@pytest.fixture
+def second_client_zmq_sink_endpoint(port_pool: PortPool) -> Generator[str]:
+    with port_pool.lease() as port:
+        yield f"bind:ipc:///tmp/cloudpin/{port}"
+
+
+@pytest.fixture
+def second_client_zmq_src_endpoint(port_pool: PortPool) -> Generator[str]:
+    with port_pool.lease() as port:
+        yield f"bind:ipc:///tmp/cloudpin/{port}"
+
+
+@pytest.fixture
+def second_client_zmq_reader(
+    second_client_zmq_sink_endpoint: str,
+) -> Generator[NonBlockingReader]:
+    endpoint = opposite_dir_url(second_client_zmq_sink_endpoint)
+    cfg = ReaderConfigBuilder(f"router+{endpoint}")
+    cfg.with_receive_timeout(100)
+    with NonBlockingReader(cfg.build(), results_queue_size=100) as reader:
+        yield reader
+
+
+@pytest.fixture
+def second_client_zmq_writer(
+    second_client_zmq_src_endpoint: str,
+) -> Generator[NonBlockingWriter]:
+    endpoint = opposite_dir_url(second_client_zmq_src_endpoint)
+    cfg = WriterConfigBuilder(f"dealer+{endpoint}")
+    cfg.with_send_timeout(100)
+    cfg.with_receive_timeout(100)
+    with NonBlockingWriter(cfg.build(), max_inflight_messages=100) as writer:
+        yield writer
+
+
+@pytest.fixture
+def second_client_zmq_sink_config(
+    second_client_zmq_sink_endpoint: str,
+) -> ZMQWriterConfig:
+    return ZMQWriterConfig(
+        max_inflight_messages=1000,
+        endpoint=second_client_zmq_sink_endpoint,
+        send_timeout=100,
+        receive_timeout=100,
+    )
+
+
+@pytest.fixture
+def second_client_zmq_src_config(
+    second_client_zmq_src_endpoint: str,
+) -> ZMQReaderConfig:
+    return ZMQReaderConfig(
+        results_queue_size=1000,
+        endpoint=second_client_zmq_src_endpoint,
+        receive_timeout=1000,
+    )
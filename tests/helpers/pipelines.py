@@ -12,6 +12,8 @@ from savant_rs.telemetry import (
 from savant_rs.utils import TelemetrySpan
 from savant_rs.zmq import ReaderConfigBuilder, ReaderResultMessage, WriterConfigBuilder
 
+from savant_cloudpin.cfg import ClientServiceConfig, ServerServiceConfig
+from savant_cloudpin.services import ClientService, ServerService
 from savant_cloudpin.zmq import NonBlockingReader, NonBlockingWriter
 from tests.helpers.messages import MessageData
 
@@ -45,6 +47,21 @@ async def run_identity_pipeline(
         await process_task
 
 
+@asynccontextmanager
+async def run_services(
+    server_config: ServerServiceConfig, client_config: ClientServiceConfig
+) -> AsyncGenerator[tuple[ServerService, ClientService]]:
+    async with ServerService(server_config) as server:
+        asyncio.create_task(server.run())
+        await server.started.wait()
+
+        async with ClientService(client_config) as client:
+            asyncio.create_task(client.run())
+            await client.started.wait()
+
+            yield server, client
+
+
 def init_telemetry_tracer(
     endpoint: str,
     name: str = "test_tracer",
@@ -1,8 +1,10 @@
 import asyncio
+from collections.abc import Sequence
 
 from savant_rs.zmq import ReaderResultMessage
 
-from savant_cloudpin.zmq import NonBlockingReader, ReaderResult
+from savant_cloudpin.zmq import NonBlockingReader, NonBlockingWriter, ReaderResult
+from tests.helpers.messages import MessageData
 
 
 async def receive_results(
@@ -29,3 +31,21 @@ async def receive_result(
 ) -> ReaderResult | None:
     results = await receive_results(reader, count=1, timeout=timeout)
     return results[0] if results else None
+
+
+async def exchange_messages(
+    writer: NonBlockingWriter,
+    reader: NonBlockingReader,
+    sequence: Sequence[MessageData],
+    *,
+    count: int | None = None,
+    timeout: float = 5,
+    interval: float | None = None,
+) -> list[ReaderResult | None]:
+    count = len(sequence) if count is None else count
+    results_sink = asyncio.create_task(receive_results(reader, count, timeout=timeout))
+    for data in sequence:
+        writer.send_message(*data)
+        if interval is not None:
+            await asyncio.sleep(interval)
+    return await results_sink
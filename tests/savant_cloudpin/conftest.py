@@ -14,6 +14,7 @@ from tests.fixtures.clients import (
     client_config,
     client_ws_config,
     nossl_client,
+    second_client_config,
     started_client_side,
     var_client,
     var_client_config,
@@ -52,6 +53,12 @@ from tests.fixtures.zmq import (
     client_zmq_src_config,
     client_zmq_src_endpoint,
     client_zmq_writer,
+    second_client_zmq_reader,
+    second_client_zmq_sink_config,
+    second_client_zmq_sink_endpoint,
+    second_client_zmq_src_config,
+    second_client_zmq_src_endpoint,
+    second_client_zmq_writer,
     server_zmq_reader,
     server_zmq_sink_config,
     server_zmq_sink_endpoint,
@@ -91,6 +98,7 @@ __all__ = [
     "client_ws_config",
     "client_config",
     "var_client_config",
+    "second_client_config",
     "client",
     "var_client",
     "another_cert_client",
@@ -123,4 +131,10 @@ __all__ = [
     "client_zmq_src_config",
     "server_zmq_src_config",
     "var_zmq_src_config",
+    "second_client_zmq_sink_endpoint",
+    "second_client_zmq_src_endpoint",
+    "second_client_zmq_reader",
+    "second_client_zmq_writer",
+    "second_client_zmq_sink_config",
+    "second_client_zmq_src_config",
 ]
@@ -0,0 +1,58 @@
+from faker import Faker
+
+from savant_cloudpin.services._clock import ClockEstimator
+
+fake = Faker()
+
+
+def exchange(
+    clock: ClockEstimator, sent: float, offset: float, forward: float, backward: float
+) -> float:
+    received = sent + forward + offset
+    replied = received + fake.pyfloat(min_value=0, max_value=0.001)
+    returned = replied - offset + backward
+    return clock.add_sample(sent, received, replied, returned)
+
+
+def test_clock_estimator() -> None:
+    clock = ClockEstimator(interval=1.0, window=8)
+    offset = fake.pyfloat(min_value=-100, max_value=100)
+
+    rtt = exchange(clock, 1000.0, offset, 0.01, 0.01)
+
+    assert rtt == clock.rtt
+    assert abs(rtt - 0.02) < 1e-6
+    assert abs(clock.offset - offset) < 1e-6
+
+
+def test_clock_estimator_when_asymmetric_delays() -> None:
+    clock = ClockEstimator(interval=1.0, window=4)
+    offset = fake.pyfloat(min_value=-100, max_value=100)
+
+    exchange(clock, 1000.0, offset, 0.5, 0.01)
+    exchange(clock, 1001.0, offset, 0.01, 0.01)
+    exchange(clock, 1002.0, offset, 0.01, 0.3)
+
+    assert clock.rtt is not None
+    assert abs(clock.rtt - 0.02) < 1e-6
+    assert abs(clock.offset - offset) < 1e-6
+
+
+def test_clock_estimator_when_window_exceeded() -> None:
+    clock = ClockEstimator(interval=1.0, window=2)
+
+    exchange(clock, 1000.0, 1.0, 0.01, 0.01)
+    exchange(clock, 1001.0, 2.0, 0.1, 0.1)
+    exchange(clock, 1002.0, 3.0, 0.2, 0.2)
+
+    assert abs(clock.offset - 2.0) < 1e-6
+
+
+def test_clock_estimator_when_no_samples() -> None:
+    clock = ClockEstimator(interval=1.0, window=2)
+
+    assert clock.offset == 0.0
+    assert clock.rtt is None
+    assert clock.needs_ping(now=1.0)
+    clock.pinged = 1.0
+    assert not clock.needs_ping(now=1.5)
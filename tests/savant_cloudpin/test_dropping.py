@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+from freezegun import freeze_time
+
+from savant_cloudpin.services._dropping import GopDropper, SinkQueue, keyframe_flag
+from savant_cloudpin.services._protocol import FrameData
+from tests.helpers.messages import MessageData
+
+
+def make_frame(topic: bytes, keyframe: bool | None) -> FrameData:
+    video_frame = MessageData.fake_video_frame()
+    video_frame.keyframe = keyframe
+    return FrameData(topic, video_frame.to_message(), b"")
+
+
+def drain(queue: SinkQueue) -> list:
+    result = []
+    while not queue.empty():
+        result.append(queue.get_nowait())
+    return result
+
+
+def test_keyframe_flag() -> None:
+    data = MessageData.fake()
+
+    assert keyframe_flag(make_frame(b"cam", True)) is True
+    assert keyframe_flag(make_frame(b"cam", False)) is False
+    assert keyframe_flag(make_frame(b"cam", None)) is None
+    if not data.msg.is_video_frame():
+        assert keyframe_flag(FrameData(data.topic, data.msg, b"")) is None
+
+
+def test_gop_dropper_when_capacity() -> None:
+    queue = SinkQueue(maxsize=10)
+    dropper = GopDropper(queue)
+    sequence = [make_frame(b"cam", i == 0) for i in range(5)]
+
+    dropped = [dropper.put(data) for data in sequence]
+
+    assert not any(dropped)
+    assert drain(queue) == sequence
+
+
+def test_gop_dropper_when_full_drops_gop_tail() -> None:
+    queue = SinkQueue(maxsize=2)
+    dropper = GopDropper(queue)
+    head = [make_frame(b"cam", True), make_frame(b"cam", False)]
+    tail = [make_frame(b"cam", False) for _ in range(3)]
+    next_keyframe = make_frame(b"cam", True)
+
+    for data in head:
+        dropper.put(data)
+    assert dropper.put(tail[0])
+    queue.get_nowait()
+    dropped = [dropper.put(data) for data in tail[1:]]
+    assert not dropper.put(next_keyframe)
+
+    assert all(dropped)
+    assert drain(queue) == [head[1], next_keyframe]
+
+
+def test_gop_dropper_when_full_evicts_before_keyframe() -> None:
+    queue = SinkQueue(maxsize=3)
+    dropper = GopDropper(queue)
+    first = [make_frame(b"first", True), make_frame(b"first", False)]
+    second = make_frame(b"second", False)
+    keyframe = make_frame(b"third", True)
+
+    for data in [*first, second]:
+        dropper.put(data)
+    assert dropper.put(keyframe)
+    assert dropper.put(make_frame(b"second", False))
+
+    assert drain(queue) == [*first, keyframe]
+
+
+def test_gop_dropper_when_full_of_keyframes() -> None:
+    queue = SinkQueue(maxsize=2)
+    dropper = GopDropper(queue)
+    keyframes = [make_frame(topic, True) for topic in (b"first", b"second")]
+
+    for data in keyframes:
+        dropper.put(data)
+
+    assert dropper.put(make_frame(b"third", True))
+    assert drain(queue) == keyframes
+
+
+def test_gop_dropper_when_full_and_keyframe_unknown() -> None:
+    queue = SinkQueue(maxsize=2)
+    dropper = GopDropper(queue)
+    frames = [make_frame(b"cam", None) for _ in range(4)]
+
+    for data in frames[:2]:
+        dropper.put(data)
+    assert dropper.put(frames[2])
+    queue.get_nowait()
+    assert not dropper.put(frames[3])
+
+    assert not dropper.skipping
+    assert drain(queue) == [frames[1], frames[3]]
+
+
+def test_sink_queue_when_timed() -> None:
+    queue = SinkQueue(maxsize=3, timed=True)
+    dropper = GopDropper(queue)
+    frames = [make_frame(b"cam", True), make_frame(b"cam", False)]
+
+    with freeze_time("2025-11-11") as frozen_time:
+        for data in frames:
+            dropper.put(data)
+            frozen_time.tick(delta=timedelta(seconds=1))
+        assert queue.evict_gop_tail() == frames[1]
+        queue.put_nowait(frames[1])
+        frozen_time.tick(delta=timedelta(seconds=3))
+
+        assert queue.get_nowait() == frames[0]
+        assert queue.residence == 5.0
+        assert queue.get_nowait() == frames[1]
+        assert queue.residence == 3.0
+
+
+def test_sink_queue_when_tracked() -> None:
+    queue = SinkQueue(maxsize=3, tracked=True)
+    dropper = GopDropper(queue)
+    frames = [make_frame(b"cam", True), make_frame(b"cam", False)]
+
+    for data in frames:
+        dropper.put(data)
+    assert queue.evict_gop_tail() == frames[1]
+    queue.put_nowait(frames[1])
+    queue.put_nowait(frames[0])
+
+    assert queue.get_nowait() == frames[0]
+    assert queue.enqueue_depth == 0
+    assert queue.get_nowait() == frames[1]
+    assert queue.enqueue_depth == 1
+    assert queue.get_nowait() == frames[0]
+    assert queue.enqueue_depth == 2
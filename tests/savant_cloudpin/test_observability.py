@@ -1,25 +1,44 @@
 import asyncio
+import marshal
 import unittest.mock
 from datetime import timedelta
 from unittest.mock import Mock, call
 
 import opentelemetry.metrics._internal
 import pytest
-from aiohttp import ClientSession
+from aiohttp import ClientSession, ClientTimeout
+from faker import Faker
 from freezegun import freeze_time
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import HistogramDataPoint, InMemoryMetricReader
 from opentelemetry.util._once import Once
 from vcr.cassette import Cassette
 
 from savant_cloudpin.cfg import (
     HealthConfig,
+    HistogramBoundaries,
     MetricsConfig,
     OTLPMetricConfig,
     PrometheusConfig,
+    SamplingConfig,
+    SourceMetricsConfig,
 )
 from savant_cloudpin.observability import serve_health_endpoint, serve_metrics
-from savant_cloudpin.services._measuring import Measurements, Metrics, ServiceSide
+from savant_cloudpin.observability._recorder import FlightRecorder, RecordedMessage
+from savant_cloudpin.services._measuring import (
+    OTHER_SOURCE,
+    Measurements,
+    MessageSampler,
+    Metrics,
+    ServiceSide,
+    SourceTracker,
+)
+from savant_cloudpin.services._video_frame import VideoFrameTimings
+from savant_cloudpin.zmq import NonBlockingReader, NonBlockingWriter
 from tests.helpers.messages import MessageData
 
+fake = Faker()
+
 
 @pytest.fixture(params=["Client", "Server"])
 def service_type(request: pytest.FixtureRequest) -> ServiceSide:
@@ -37,6 +56,97 @@ async def test_health(
         assert await response.text() == "OK"
 
 
+@pytest.mark.asyncio
+async def test_health_debug_endpoints(
+    health_config: HealthConfig, client_session: ClientSession
+) -> None:
+    base_url = health_config.endpoint.removesuffix("/healthz")
+    health_config.debug = True
+
+    async with serve_health_endpoint(health_config):
+        tasks = await client_session.get(f"{base_url}/debug/tasks")
+        profile = await client_session.get(f"{base_url}/debug/profile?seconds=0.1")
+        pstats = await client_session.get(
+            f"{base_url}/debug/profile?seconds=0.1&format=pstats"
+        )
+        invalid = await client_session.get(f"{base_url}/debug/profile?seconds=x")
+        unsupported = await client_session.get(
+            f"{base_url}/debug/profile?seconds=300&format=html",
+            timeout=ClientTimeout(total=5),
+        )
+
+        assert tasks.status == 200
+        assert "Stack for" in await tasks.text()
+        assert profile.status == 200
+        assert "function calls" in await profile.text()
+        assert pstats.status == 200
+        assert marshal.loads(await pstats.read())
+        assert invalid.status == 400
+        assert unsupported.status == 400
+
+
+@pytest.mark.asyncio
+async def test_health_flight_recorder_dump(
+    health_config: HealthConfig, client_session: ClientSession
+) -> None:
+    base_url = health_config.endpoint.removesuffix("/healthz")
+    health_config.debug = True
+    recorder = FlightRecorder("Client", size=2)
+    timings = {"client_source_timestamp": 1.0, "server_sink_timestamp": 2.0}
+    for idx in range(3):
+        recorder.record((float(idx), "Source", b"t", "s", 10, idx, idx - 1, timings))
+
+    async with serve_health_endpoint(health_config, recorder):
+        as_json = await client_session.get(f"{base_url}/debug/messages")
+        as_csv = await client_session.get(f"{base_url}/debug/messages?format=csv")
+        invalid = await client_session.get(f"{base_url}/debug/messages?format=x")
+
+        entries = await as_json.json()
+        rows = (await as_csv.text()).splitlines()
+
+    assert [entry["enqueue_depth"] for entry in entries] == [1, 2]
+    assert [entry["dequeue_depth"] for entry in entries] == [0, 1]
+    assert entries[0]["timings"] == timings
+    assert rows[0].endswith(
+        "enqueue_depth,dequeue_depth,client_source_timestamp,server_sink_timestamp"
+    )
+    assert rows[1:] == [
+        "1.0,Client,Source,t,s,10,1,0,1.0,2.0",
+        "2.0,Client,Source,t,s,10,2,1,1.0,2.0",
+    ]
+    assert invalid.status == 400
+
+
+def test_flight_recorder() -> None:
+    recorder = FlightRecorder("Server", size=3)
+    entries = [
+        RecordedMessage(float(idx), "Server", "Sink", "t", None, idx, 0, 0, None)
+        for idx in range(5)
+    ]
+
+    assert recorder.snapshot() == []
+    for idx in range(2):
+        recorder.record((float(idx), "Sink", b"t", None, idx, 0, 0, None))
+    assert recorder.snapshot() == entries[:2]
+    for idx in range(2, 5):
+        recorder.record((float(idx), "Sink", b"t", None, idx, 0, 0, None))
+    assert recorder.snapshot() == entries[2:]
+    with pytest.raises(ValueError):
+        FlightRecorder("Server", size=0)
+
+
+@pytest.mark.asyncio
+async def test_health_when_debug_disabled(
+    health_config: HealthConfig, client_session: ClientSession
+) -> None:
+    base_url = health_config.endpoint.removesuffix("/healthz")
+
+    async with serve_health_endpoint(health_config):
+        response = await client_session.get(f"{base_url}/debug/tasks")
+
+        assert response.status == 404
+
+
 @pytest.fixture
 def reset_meter_provider() -> None:
     opentelemetry.metrics._internal._METER_PROVIDER_SET_ONCE = Once()
@@ -124,3 +234,270 @@ def test_measurements_for_video_frame(delay_mock: Mock) -> None:
         call(3.0, {"service": "Client", "path_start": "Server", "path_end": "Client"}),
         call(15.0, {"service": "Client", "path_start": "Client", "path_end": "Client"}),
     ]
+
+
+@unittest.mock.patch.object(Metrics, "delay")
+def test_measurements_for_video_frame_when_clock_offset(delay_mock: Mock) -> None:
+    client_measurements = Measurements("Client", None)
+    server_measurements = Measurements("Server", None)
+    msg = MessageData.fake_video_frame().to_message()
+
+    with freeze_time("2025-11-11", tz_offset=0) as frozen_time:
+        client_measurements.add_src_message_measure(msg)
+        frozen_time.tick(delta=timedelta(seconds=7))
+        server_measurements.add_sink_message_measure(msg, clock_offset=-5.0)
+        frozen_time.tick(delta=timedelta(seconds=10))
+        server_measurements.add_src_message_measure(msg, clock_offset=-5.0)
+        frozen_time.tick(delta=timedelta(seconds=8))
+        client_measurements.add_sink_message_measure(msg, clock_offset=5.0)
+
+    assert delay_mock.record.call_args_list == [
+        call(2.0, {"service": "Server", "path_start": "Client", "path_end": "Server"}),
+        call(2.0, {"service": "Server", "path_start": "Client", "path_end": "Server"}),
+        call(10.0, {"service": "Server", "path_start": "Server", "path_end": "Server"}),
+        call(2.0, {"service": "Client", "path_start": "Client", "path_end": "Server"}),
+        call(10.0, {"service": "Client", "path_start": "Server", "path_end": "Server"}),
+        call(13.0, {"service": "Client", "path_start": "Server", "path_end": "Client"}),
+        call(25.0, {"service": "Client", "path_start": "Client", "path_end": "Client"}),
+    ]
+
+
+@unittest.mock.patch.object(Metrics, "delay")
+def test_measurements_for_sampled_video_frames(delay_mock: Mock) -> None:
+    config = MetricsConfig(sampling=SamplingConfig(every=2))
+    client_measurements = Measurements("Client", config)
+    server_measurements = Measurements("Server", MetricsConfig())
+    unsampled = MessageData.fake_video_frame().to_message()
+    sampled = MessageData.fake_video_frame().to_message()
+
+    client_measurements.add_src_message_measure(unsampled)
+    client_measurements.add_src_message_measure(sampled)
+    server_measurements.add_sink_message_measure(sampled)
+    delay_mock.reset_mock()
+    client_measurements.add_sink_message_measure(unsampled)
+    client_measurements.add_sink_message_measure(sampled)
+
+    assert VideoFrameTimings(unsampled).values is None
+    assert VideoFrameTimings(sampled).values
+    path_ends = [c.args[1]["path_end"] for c in delay_mock.record.call_args_list]
+    assert path_ends == ["Server", "Client"]
+
+
+@unittest.mock.patch.object(Metrics, "messages")
+def test_measurements_when_sampled_every(messages_mock: Mock) -> None:
+    every = fake.random_int(2, 10)
+    count = every * fake.random_int(2, 10)
+    config = MetricsConfig(sampling=SamplingConfig(every=every))
+    measurements = Measurements("Client", config)
+
+    for _ in range(count):
+        measurements.add_src_message_measure(MessageData.fake().msg)
+
+    assert messages_mock.add.call_count == count // every
+    assert sum(c.args[0] for c in messages_mock.add.call_args_list) == count
+
+
+def test_message_sampler_when_per_second() -> None:
+    sampler = MessageSampler(SamplingConfig(per_second=1))
+
+    with freeze_time("2025-11-11") as frozen_time:
+        assert sampler.sample(b"first") == 1
+        assert sampler.sample(b"second") == 1
+        assert sampler.sample(b"first") == 0
+        assert sampler.sample(b"first") == 0
+        frozen_time.tick(delta=timedelta(seconds=1))
+        assert sampler.sample(b"first") == 3
+        assert sampler.sample(b"second") == 1
+
+
+def test_message_sampler_when_source_idle() -> None:
+    sampler = MessageSampler(SamplingConfig(per_second=1))
+
+    with freeze_time("2025-11-11") as frozen_time:
+        sampler.sample(b"idle")
+        frozen_time.tick(delta=timedelta(seconds=10))
+        sampler.sample(b"active")
+        assert len(sampler) == 2
+        frozen_time.tick(delta=timedelta(seconds=10))
+        sampler.sample(b"active")
+
+    assert len(sampler) == 1
+
+
+@pytest.mark.parametrize("config", [SamplingConfig(0), SamplingConfig(1, -1.0)])
+def test_message_sampler_when_invalid(config: SamplingConfig) -> None:
+    with pytest.raises(ValueError):
+        MessageSampler(config)
+
+
+def test_measurements_when_locally_aggregated() -> None:
+    reader = InMemoryMetricReader()
+    boundaries = HistogramBoundaries(message_size=[10.0, 100.0])
+    measurements = Measurements(
+        "Client", MetricsConfig(histogram_boundaries=boundaries)
+    )
+    measurements.metrics._meter_provider = MeterProvider(metric_readers=[reader])
+    sizes = [fake.random_int(1, 200) for _ in range(fake.random_int(5, 50))]
+
+    for size in sizes:
+        measurements.measure_sink_message_data(bytes(size))
+        measurements.metrics.messages.add(1, {"service": "Client"})
+
+    for _ in range(2):
+        data = reader.get_metrics_data()
+        assert data
+        metrics = {
+            metric.name: metric.data.data_points
+            for resource in data.resource_metrics
+            for scope in resource.scope_metrics
+            for metric in scope.metrics
+        }
+        assert "histogram_batches" not in metrics
+        (messages,) = metrics["messages"]
+        assert messages.value == len(sizes)
+        (message_size,) = metrics["message_size"]
+        assert isinstance(message_size, HistogramDataPoint)
+        assert message_size.count == len(sizes)
+        assert message_size.sum == pytest.approx(sum(sizes))
+        assert list(message_size.bucket_counts) == [
+            sum(size <= 10 for size in sizes),
+            sum(10 < size <= 100 for size in sizes),
+            sum(size > 100 for size in sizes),
+        ]
+
+
+def test_measurements_zmq_capacity() -> None:
+    reader = InMemoryMetricReader()
+    measurements = Measurements("Server", None)
+    measurements.metrics._meter_provider = MeterProvider(metric_readers=[reader])
+    zmq_reader = Mock(spec=NonBlockingReader, results_queue_size=10)
+    zmq_reader.enqueued_results.return_value = 3
+    zmq_writer = Mock(spec=NonBlockingWriter, max_inflight_messages=20)
+    zmq_writer.inflight_messages.return_value = 5
+
+    measurements.observe_zmq_capacity(zmq_reader)
+    measurements.observe_zmq_capacity(zmq_writer)
+    data = reader.get_metrics_data()
+
+    assert data
+    metrics = {
+        metric.name: {
+            point.attributes["socket"]: point.value for point in metric.data.data_points
+        }
+        for resource in data.resource_metrics
+        for scope in resource.scope_metrics
+        for metric in scope.metrics
+    }
+    assert metrics["consumed_zmq_capacity"] == {"Source": 3, "Sink": 5}
+    assert metrics["left_zmq_capacity"] == {"Source": 7, "Sink": 15}
+
+
+def test_source_tracker_when_limit_exceeded() -> None:
+    config = SourceMetricsConfig(enabled=True, max_sources=2, idle_timeout=10)
+    tracker = SourceTracker(config, lambda source, path: {"source": source})
+
+    assert tracker.track("first", 1, now=0.0) == "first"
+    assert tracker.track("second", 1, now=1.0) == "second"
+    assert tracker.track("third", 1, now=2.0) == OTHER_SOURCE
+    assert tracker.track("first", 1, now=5.0) == "first"
+    assert tracker.track("third", 1, now=12.0) == "third"
+    assert tracker.track("fourth", 1, now=13.0) == OTHER_SOURCE
+    assert len(tracker) == 2
+
+
+def test_source_tracker_fps_and_jitter() -> None:
+    config = SourceMetricsConfig(enabled=True)
+    tracker = SourceTracker(config, lambda source, path: {"source": source})
+    arrivals = [idx * 0.04 for idx in range(50)]
+
+    for now in arrivals:
+        tracker.track("steady", 1, now)
+    for idx, now in enumerate(arrivals):
+        tracker.track("jittery", 1, now + (0.01 if idx % 2 else 0.0))
+
+    fps = {obs.attributes["source"]: obs.value for obs in tracker.observe_fps(2.0)}
+    jitter = {
+        obs.attributes["source"]: obs.value for obs in tracker.observe_jitter(2.0)
+    }
+    assert fps["steady"] == pytest.approx(25.0)
+    assert fps["jittery"] == pytest.approx(25.0, rel=0.1)
+    assert jitter["steady"] == pytest.approx(0.0, abs=1e-9)
+    assert jitter["jittery"] > 0.005
+    stalled = {obs.attributes["source"]: obs.value for obs in tracker.observe_fps(12)}
+    assert stalled["steady"] == pytest.approx(0.1, rel=0.1)
+
+
+def test_source_tracker_when_idle() -> None:
+    config = SourceMetricsConfig(enabled=True, max_sources=2, idle_timeout=10)
+    evicted = Mock()
+    tracker = SourceTracker(config, lambda source, path: {"source": source}, evicted)
+
+    tracker.track("first", 1, now=0.0)
+    tracker.track("second", 1, now=1.0)
+    tracker.track("second", 1, now=2.0)
+    tracker.track_delay("second", ("Client", "Server"), 0.05)
+
+    assert [obs.attributes["source"] for obs in tracker.observe_jitter(11)] == [
+        "second"
+    ]
+    assert [obs.value for obs in tracker.observe_delay(11)] == [0.05]
+    assert tracker.track("third", 1, now=11.0) == "third"
+    evicted.assert_called_once_with("first")
+    assert not tracker.observe_delay(20)
+
+
+def test_measurements_when_source_evicted() -> None:
+    reader = InMemoryMetricReader()
+    sources = SourceMetricsConfig(enabled=True, max_sources=1, idle_timeout=10)
+    measurements = Measurements("Server", MetricsConfig(sources=sources))
+    measurements.metrics._meter_provider = MeterProvider(metric_readers=[reader])
+    first, second = [MessageData.fake_video_frame() for _ in range(2)]
+
+    with unittest.mock.patch("time.monotonic", return_value=0.0):
+        measurements.add_sink_message_measure(first.to_message())
+    with unittest.mock.patch("time.monotonic", return_value=20.0):
+        measurements.add_sink_message_measure(second.to_message())
+    data = reader.get_metrics_data()
+
+    assert data
+    (source_messages,) = [
+        metric.data.data_points
+        for resource in data.resource_metrics
+        for scope in resource.scope_metrics
+        for metric in scope.metrics
+        if metric.name == "source_messages"
+    ]
+    assert [point.attributes["source"] for point in source_messages] == [
+        second.source_id
+    ]
+
+
+@unittest.mock.patch.object(Metrics, "source_messages")
+def test_measurements_when_per_source(source_messages_mock: Mock) -> None:
+    config = MetricsConfig(sources=SourceMetricsConfig(enabled=True, max_sources=1))
+    measurements = Measurements("Server", config)
+    frames = [MessageData.fake_video_frame() for _ in range(2)]
+
+    for frame in [*frames, frames[0]]:
+        measurements.add_sink_message_measure(frame.to_message())
+
+    sources = [c.args[1]["source"] for c in source_messages_mock.add.call_args_list]
+    assert sources == [frames[0].source_id, OTHER_SOURCE, frames[0].source_id]
+
+
+@unittest.mock.patch.object(Metrics, "source_queue_depth")
+def test_measurements_source_queue_depth(source_queue_depth_mock: Mock) -> None:
+    config = MetricsConfig(sources=SourceMetricsConfig(enabled=True, max_sources=1))
+    measurements = Measurements("Client", config)
+    frames = [MessageData.fake_video_frame() for _ in range(2)]
+    timings = [measurements.add_src_message_measure(f.to_message()) for f in frames]
+
+    for depth, frame_timings in enumerate([*timings, None], 1):
+        measurements.measure_source_queue_depth(depth, frame_timings)
+
+    calls = source_queue_depth_mock.record.call_args_list
+    assert [(c.args[0], c.args[1]["source"]) for c in calls] == [
+        (1, frames[0].source_id),
+        (2, OTHER_SOURCE),
+        (3, OTHER_SOURCE),
+    ]
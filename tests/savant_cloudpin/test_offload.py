@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from faker import Faker
+
+from savant_cloudpin.cfg import SerializationConfig
+from savant_cloudpin.services._offload import OrderedOffload, create_executor
+
+fake = Faker()
+
+
+def delayed(value: int) -> int:
+    time.sleep(fake.pyfloat(min_value=0, max_value=0.005))
+    return value
+
+
+@pytest.mark.asyncio
+async def test_ordered_offload() -> None:
+    count = fake.random_int(20, 50)
+    results = list[int | None]()
+
+    with ThreadPoolExecutor(4) as executor:
+        offload = OrderedOffload[int](executor, max_pending=8)
+        for value in range(count):
+            if offload.is_full():
+                results.append(await offload.next())
+            if value % 5:
+                offload.submit(delayed, value)
+            else:
+                offload.put(value)
+        while offload:
+            results.append(await offload.next())
+
+    assert results == list(range(count))
+    assert await offload.next() is None
+
+
+def test_create_executor() -> None:
+    assert create_executor(SerializationConfig()) is None
+
+    executor = create_executor(SerializationConfig(workers=2))
+    assert isinstance(executor, ThreadPoolExecutor)
+    executor.shutdown()
+
+    with pytest.raises(ValueError):
+        create_executor(SerializationConfig(workers=-1))
@@ -0,0 +1,155 @@
+import pytest
+from faker import Faker
+from savant_rs.utils import serialization
+
+from savant_cloudpin.services import _protocol as protocol
+from tests.helpers.messages import MessageData
+
+fake = Faker()
+
+
+def is_same_frame(data: MessageData, frame: protocol.FrameData) -> bool:
+    msg_bytes = serialization.save_message_to_bytes(data.msg)
+    frame_bytes = serialization.save_message_to_bytes(frame.message)
+    return (
+        data.topic == frame.topic
+        and (data.extra or b"") == frame.extra
+        and msg_bytes == frame_bytes
+    )
+
+
+def pack_frame(data: MessageData) -> bytes:
+    return protocol.pack_record(protocol.dump_record(*data))
+
+
+def unpack_frames(payload: bytes | memoryview) -> list[protocol.FrameData]:
+    return [protocol.load_record(rec) for rec in protocol.split_stream_frames(payload)]
+
+
+def test_split_stream_frames_when_single_frame() -> None:
+    data = MessageData.fake()
+
+    result = unpack_frames(pack_frame(data))
+
+    assert len(result) == 1
+    assert is_same_frame(data, result[0])
+
+
+def test_split_stream_frames_when_memoryview() -> None:
+    data = MessageData.fake()
+    payload = bytearray(pack_frame(data))
+
+    result = protocol.split_stream_frames(memoryview(payload))
+    payload[:] = bytes(len(payload))
+
+    assert len(result) == 1
+    assert all(isinstance(part, bytes) for part in result[0])
+    assert is_same_frame(data, protocol.load_record(result[0]))
+
+
+@pytest.mark.parametrize("max_messages", [1, 2, 16])
+def test_frame_batch_when_packed(max_messages: int) -> None:
+    sequence = [MessageData.fake() for _ in range(fake.random_int(1, 16))]
+    batch = protocol.FrameBatch(max_messages=max_messages)
+
+    result = list[protocol.FrameData]()
+    for data in sequence:
+        batch.append_record(protocol.dump_record(*data))
+        if batch.is_full():
+            result.extend(unpack_frames(batch.pack()))
+            batch.clear()
+    if batch:
+        result.extend(unpack_frames(batch.pack()))
+
+    assert len(result) == len(sequence)
+    assert all(is_same_frame(data, res) for data, res in zip(sequence, result))
+
+
+def test_frame_batch_when_buffer_reused() -> None:
+    sequence = [MessageData.fake(large=True) for _ in range(3)]
+    batch = protocol.FrameBatch(max_messages=1, capacity=16)
+
+    result = list[protocol.FrameData]()
+    for data in sequence:
+        batch.append_record(protocol.dump_record(*data))
+        result.extend(unpack_frames(batch.pack()))
+        batch.clear()
+
+    assert all(is_same_frame(data, res) for data, res in zip(sequence, result))
+
+
+def test_frame_batch_when_max_bytes_exceeded() -> None:
+    batch = protocol.FrameBatch(max_messages=100, max_bytes=1)
+
+    batch.append_record(protocol.dump_record(*MessageData.fake()))
+
+    assert batch.is_full()
+    assert batch.size > protocol.BATCH_HEAD_SIZE
+
+
+@pytest.mark.skipif(not protocol.SUPPORTED_CODECS, reason="No compression codecs")
+def test_frame_compressor_when_compressed() -> None:
+    data = MessageData.fake(large=True)
+    frame = pack_frame(data)
+    compressor = protocol.FrameCompressor("zstd", level=3, min_size=0)
+
+    compressed = compressor.compress(frame)
+
+    assert compressed is not None
+    assert len(compressed) < len(frame)
+    assert protocol.is_compressed_frame(compressed)
+    assert protocol.decompress_stream_frame(compressed) == frame
+    assert is_same_frame(data, unpack_frames(compressed)[0])
+
+
+@pytest.mark.skipif(not protocol.SUPPORTED_CODECS, reason="No compression codecs")
+def test_frame_compressor_when_below_min_size() -> None:
+    frame = pack_frame(MessageData.fake())
+    compressor = protocol.FrameCompressor("zstd", level=3, min_size=len(frame) + 1)
+
+    assert compressor.compress(frame) is None
+    assert not protocol.is_compressed_frame(frame)
+
+
+def test_frame_compressor_when_unsupported_codec() -> None:
+    with pytest.raises(ValueError):
+        protocol.FrameCompressor(fake.pystr(), level=3, min_size=0)
+
+
+def test_control_message() -> None:
+    count = fake.random_int(1, 1000)
+
+    payload = protocol.pack_control(protocol.CREDIT_CONTROL, messages=count)
+    control = protocol.unpack_control(payload.decode())
+
+    assert control == {"type": protocol.CREDIT_CONTROL, "messages": count}
+
+
+@pytest.mark.parametrize("payload", ["[]", "{}", "not json"])
+def test_control_message_when_invalid(payload: str) -> None:
+    with pytest.raises(ValueError):
+        protocol.unpack_control(payload)
+
+
+def test_sequenced_frame() -> None:
+    data = MessageData.fake()
+    seq = fake.random_int(1, 1_000_000)
+    frame = pack_frame(data)
+
+    sequenced = protocol.pack_sequenced_frame(seq, frame)
+    unpacked_seq, payload = protocol.split_sequenced_frame(memoryview(sequenced))
+
+    assert unpacked_seq == seq
+    assert payload == frame
+    assert is_same_frame(data, unpack_frames(payload)[0])
+    with pytest.raises(ValueError):
+        protocol.split_stream_frames(sequenced)
+
+
+def test_sequenced_frame_when_not_sequenced() -> None:
+    frame = pack_frame(MessageData.fake())
+
+    seq, payload = protocol.split_sequenced_frame(memoryview(frame))
+
+    assert seq is None
+    assert payload == frame
@@ -0,0 +1,135 @@
+from collections import Counter
+
+import pytest
+from faker import Faker
+
+from savant_cloudpin.cfg import SchedulingConfig
+from savant_cloudpin.services._protocol import RawRecord
+from savant_cloudpin.services._scheduling import (
+    FairScheduler,
+    OutboundScheduler,
+    QueuedRecord,
+    create_scheduler,
+)
+
+fake = Faker()
+
+
+def make_item(topic: bytes, size: int) -> QueuedRecord:
+    return QueuedRecord(RawRecord(topic, fake.binary(length=size), b""), "Bulk", 0.0)
+
+
+def drain(scheduler: FairScheduler | OutboundScheduler) -> list[QueuedRecord]:
+    result = list[QueuedRecord]()
+    while item := scheduler.pop():
+        result.append(item)
+    return result
+
+
+def test_fair_scheduler_when_single_source() -> None:
+    scheduler = FairScheduler(quantum=100, weights={})
+    sequence = [make_item(b"cam", fake.random_int(1, 500)) for _ in range(20)]
+
+    for item in sequence:
+        scheduler.push(item)
+
+    assert len(scheduler) == len(sequence)
+    assert drain(scheduler) == sequence
+    assert not scheduler
+
+
+def test_fair_scheduler_when_heavy_source() -> None:
+    scheduler = FairScheduler(quantum=1000, weights={})
+    for _ in range(100):
+        scheduler.push(make_item(b"heavy", 1000))
+    for _ in range(10):
+        scheduler.push(make_item(b"light", 100))
+
+    head = [item.record.topic for item in drain(scheduler)[:20]]
+
+    assert head.count(b"light") == 10
+
+
+def test_fair_scheduler_when_weights() -> None:
+    scheduler = FairScheduler(quantum=1000, weights={"fast": 3.0})
+    for _ in range(100):
+        scheduler.push(make_item(b"fast", 96))
+        scheduler.push(make_item(b"slow", 96))
+
+    head = Counter(item.record.topic for item in drain(scheduler)[:40])
+
+    assert head[b"fast"] == 3 * head[b"slow"]
+
+
+def test_fair_scheduler_depth() -> None:
+    scheduler = FairScheduler(quantum=100, weights={})
+
+    depths = [scheduler.push(make_item(b"cam", 10)) for _ in range(3)]
+
+    assert depths == [1, 2, 3]
+    assert scheduler.depth(b"cam") == 3
+    assert scheduler.depth(b"other") == 0
+
+
+@pytest.mark.parametrize("policy", ["fifo", "drr"])
+def test_outbound_scheduler_when_priority(policy: str) -> None:
+    config = SchedulingConfig(policy=policy, priority_types=["end_of_stream"])
+    scheduler = OutboundScheduler(config)
+    bulk = [make_item(b"cam", 100).record for _ in range(10)]
+    other = [make_item(b"other", 100).record for _ in range(10)]
+    priority = make_item(b"other", 10).record
+
+    for record, other_record in zip(bulk, other):
+        scheduler.push(record, priority=False)
+        scheduler.push(other_record, priority=False)
+    scheduler.push(priority, priority=True)
+    result = drain(scheduler)
+    priority_idx = [item.record for item in result].index(priority)
+
+    assert result[priority_idx].lane == "Priority"
+    assert [item.record for item in result[:priority_idx]] == other
+    assert [item.record for item in result[priority_idx + 1 :]] == bulk
+    assert all(item.lane == "Bulk" for item in result if item.record != priority)
+
+
+def test_outbound_scheduler_when_full() -> None:
+    scheduler = OutboundScheduler(SchedulingConfig(max_pending=3))
+
+    for _ in range(3):
+        scheduler.push(make_item(b"cam", 10).record, priority=False)
+
+    assert scheduler.is_full()
+    scheduler.pop()
+    assert not scheduler.is_full()
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        SchedulingConfig(policy="bogus"),
+        SchedulingConfig(priority_types=["bogus"]),
+        SchedulingConfig(policy="drr", quantum=0),
+        SchedulingConfig(policy="drr", weights={"cam": 0.0}),
+    ],
+)
+def test_outbound_scheduler_when_invalid_config(config: SchedulingConfig) -> None:
+    with pytest.raises(ValueError):
+        OutboundScheduler(config)
+
+
+def test_create_scheduler_when_fifo_without_priority() -> None:
+    assert create_scheduler(SchedulingConfig()) is None
+    assert create_scheduler(SchedulingConfig(priority_types=["shutdown"])) is not None
+    assert create_scheduler(SchedulingConfig(policy="drr")) is not None
+
+
+def test_outbound_scheduler_when_max_age() -> None:
+    scheduler = OutboundScheduler(SchedulingConfig())
+
+    scheduler.push(make_item(b"cam", 10).record, priority=False, max_age=1.0)
+    scheduler.push(make_item(b"cam", 10).record, priority=False)
+    first, second = drain(scheduler)
+
+    assert first.expires == first.enqueued + 1.0
+    assert not second.expires
+    assert (first.depth, second.depth) == (0, 1)
@@ -1,18 +1,46 @@
 import asyncio
+import pathlib
 import unittest
 import unittest.mock
-from unittest.mock import Mock
+import zlib
+from unittest.mock import Mock, call
 
 import pytest
 from faker import Faker
+from picows import WSMsgType
+from savant_rs.primitives import EndOfStream
+from savant_rs.utils.serialization import Message
 from savant_rs.zmq import ReaderResultMessage
 
-from savant_cloudpin.cfg import ServerServiceConfig
+from savant_cloudpin.cfg import (
+    BatchingConfig,
+    ClientServiceConfig,
+    ClockSyncConfig,
+    CompressionConfig,
+    FlightRecorderConfig,
+    FlowControlConfig,
+    LoopMonitorConfig,
+    MetricsConfig,
+    PassthroughConfig,
+    SamplingConfig,
+    SchedulingConfig,
+    SerializationConfig,
+    ServerServiceConfig,
+    SessionConfig,
+    SheddingConfig,
+    SpilloverConfig,
+    ZMQReaderConfig,
+)
 from savant_cloudpin.services import ClientService, ServerService
+from savant_cloudpin.services import _protocol as protocol
 from savant_cloudpin.services._base import ServiceConnection
+from savant_cloudpin.services._measuring import Measurements, Metrics
+from savant_cloudpin.services._scheduling import QueuedRecord
+from savant_cloudpin.services._session import Session
 from savant_cloudpin.zmq import NonBlockingReader, NonBlockingWriter
 from tests import helpers
 from tests.helpers.messages import MessageData
+from tests.helpers.pipelines import run_services
 
 fake = Faker()
 
@@ -167,6 +195,137 @@ async def test_identity_pipeline_when_reconnect(
     assert reconnect_data.is_same(reconnect_res)
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+async def test_identity_pipeline_when_spillover(
+    tmp_path: pathlib.Path,
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(50, 100)
+    sequence = [MessageData.fake() for _ in range(count)]
+    client_config.websockets.reconnect_timeout = 0.1
+    client_config.spillover = SpilloverConfig(path=str(tmp_path / "spillover"))
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with ClientService(client_config) as client:
+        asyncio.create_task(client.run())
+        await client.started.wait()
+
+        for data in sequence:
+            client_zmq_writer.send_message(*data)
+            await asyncio.sleep(0)
+
+        async with ServerService(server_config) as server:
+            asyncio.create_task(server.run())
+            await server.started.wait()
+
+            results = await helpers.zmq.receive_results(
+                client_zmq_reader, count, timeout=30
+            )
+
+    assert len(results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+async def test_identity_pipeline_when_spillover_drained_with_live_traffic(
+    tmp_path: pathlib.Path,
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(40, 60)
+    topic = fake.domain_word().encode()
+    sequence = [MessageData.fake()._replace(topic=topic) for _ in range(count)]
+    client_config.websockets.reconnect_timeout = 0.1
+    client_config.spillover = SpilloverConfig(
+        path=str(tmp_path / "spillover"), drain_rate=65536
+    )
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with ClientService(client_config) as client:
+        asyncio.create_task(client.run())
+        await client.started.wait()
+
+        for data in sequence[: count // 2]:
+            client_zmq_writer.send_message(*data)
+            await asyncio.sleep(0)
+
+        async with ServerService(server_config) as server:
+            asyncio.create_task(server.run())
+            await server.started.wait()
+
+            results = await helpers.zmq.exchange_messages(
+                client_zmq_writer,
+                client_zmq_reader,
+                sequence[count // 2 :],
+                count=count,
+                timeout=30,
+                interval=0.01,
+            )
+
+    assert len(results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+async def test_identity_pipeline_when_spillover_drained_with_unspilled_topic(
+    tmp_path: pathlib.Path,
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    spilled_topic, live_topic = b"spilled", b"live"
+    spilled = [MessageData.fake()._replace(topic=spilled_topic) for _ in range(30)]
+    live = [MessageData.fake()._replace(topic=live_topic) for _ in range(5)]
+    client_config.websockets.reconnect_timeout = 0.1
+    client_config.spillover = SpilloverConfig(
+        path=str(tmp_path / "spillover"), drain_rate=16384
+    )
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with ClientService(client_config) as client:
+        asyncio.create_task(client.run())
+        await client.started.wait()
+
+        for data in spilled:
+            client_zmq_writer.send_message(*data)
+            await asyncio.sleep(0)
+
+        async with ServerService(server_config) as server:
+            asyncio.create_task(server.run())
+            await server.started.wait()
+
+            results = await helpers.zmq.exchange_messages(
+                client_zmq_writer,
+                client_zmq_reader,
+                live,
+                count=len(spilled) + len(live),
+                timeout=30,
+            )
+
+    received = [res for res in results if isinstance(res, ReaderResultMessage)]
+    topics = [res.topic for res in received]
+    last_spilled = len(topics) - 1 - topics[::-1].index(spilled_topic)
+    assert len(received) == len(spilled) + len(live)
+    assert topics.index(live_topic) < last_spilled
+    drained = [res for res in received if res.topic == spilled_topic]
+    assert all(expected.is_same(res) for res, expected in zip(drained, spilled))
+
+
 @pytest.mark.asyncio
 @pytest.mark.usefixtures("identity_pipeline")
 async def test_identity_pipeline_when_nossl(
@@ -225,8 +384,173 @@ async def test_identity_pipeline_when_sequence(
     assert all(expected.is_same(res) for res, expected in zip(results, sequence))
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+async def test_identity_pipeline_when_batching(
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(32, 64)
+    sequence = [MessageData.fake() for _ in range(count)]
+    batching = BatchingConfig(max_messages=8, linger=0.05)
+    client_config.batching = batching
+    server_config.batching = batching
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with run_services(server_config, client_config):
+        results = await helpers.zmq.exchange_messages(
+            client_zmq_writer, client_zmq_reader, sequence, timeout=10
+        )
+
+    assert len(results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+async def test_identity_pipeline_when_serialization_offloaded(
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(500, 1000)
+    sequence = [MessageData.fake() for _ in range(count)]
+    client_config.serialization = SerializationConfig(workers=4)
+    server_config.serialization = SerializationConfig(workers=4)
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with run_services(server_config, client_config):
+        results = await helpers.zmq.exchange_messages(
+            client_zmq_writer, client_zmq_reader, sequence, timeout=30, interval=0
+        )
+
+    assert len(results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+async def test_identity_pipeline_when_fair_scheduling(
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(64, 128)
+    topics = [b"heavy", b"light"]
+    sequence = [
+        MessageData.fake()._replace(topic=fake.random_element(topics))
+        for _ in range(count)
+    ]
+    scheduling = SchedulingConfig(policy="drr", quantum=1024, weights={"light": 2.0})
+    client_config.scheduling = scheduling
+    server_config.scheduling = scheduling
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with run_services(server_config, client_config):
+        results = await helpers.zmq.exchange_messages(
+            client_zmq_writer, client_zmq_reader, sequence, timeout=10
+        )
+
+    assert len(results) == count
+    for topic in topics:
+        topic_sequence = [data for data in sequence if data.topic == topic]
+        topic_results = [
+            res
+            for res in results
+            if isinstance(res, ReaderResultMessage) and res.topic == topic
+        ]
+        assert all(
+            expected.is_same(res)
+            for res, expected in zip(topic_results, topic_sequence)
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+async def test_identity_pipeline_when_priority_lane(
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(32, 64)
+    sequence = [MessageData.fake() for _ in range(count)]
+    eos = MessageData(
+        topic=b"eos", msg=Message.end_of_stream(EndOfStream("eos")), extra=None
+    )
+    scheduling = SchedulingConfig(priority_types=["end_of_stream"])
+    client_config.scheduling = scheduling
+    server_config.scheduling = scheduling
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with run_services(server_config, client_config) as (_, client):
+        scheduler = client._scheduler
+        assert scheduler
+        pop = scheduler.pop
+        released = False
+
+        def pop_when_backlogged() -> QueuedRecord | None:
+            nonlocal released
+            released = released or len(scheduler) > count
+            return pop() if released else None
+
+        with unittest.mock.patch.object(scheduler, "pop", pop_when_backlogged):
+            results = await helpers.zmq.exchange_messages(
+                client_zmq_writer, client_zmq_reader, [*sequence, eos], timeout=10
+            )
+
+    assert len(results) == count + 1
+    assert eos.is_same(results[0])
+    results = results[1:]
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+@pytest.mark.skipif(not protocol.SUPPORTED_CODECS, reason="No compression codecs")
+@pytest.mark.parametrize("side", ["client", "server", "both"])
+async def test_identity_pipeline_when_compression(
+    side: str,
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(8, 16)
+    sequence = [MessageData.fake(large=True) for _ in range(count)]
+    compression = CompressionConfig(codec="zstd", min_size=0)
+    if side in ("client", "both"):
+        client_config.compression = compression
+    if side in ("server", "both"):
+        server_config.compression = compression
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with run_services(server_config, client_config):
+        results = await helpers.zmq.exchange_messages(
+            client_zmq_writer, client_zmq_reader, sequence, timeout=10
+        )
+
+    assert len(results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+
+
 original_pause_writing = ServiceConnection.pause_writing
 original_increment_drops = ServiceConnection.increment_drops
+original_pause_reading = ServiceConnection.pause_reading
 
 
 @pytest.mark.asyncio
@@ -310,6 +634,643 @@ async def test_when_sink_buffer_exceeded(
     assert increment_drops_mock.called
 
 
+@pytest.mark.asyncio
+@unittest.mock.patch.object(ServiceConnection, "increment_drops", autospec=True)
+@unittest.mock.patch.object(ServiceConnection, "pause_reading", autospec=True)
+async def test_when_sink_buffer_exceeded_and_pause_policy(
+    pause_reading_mock: Mock,
+    increment_drops_mock: Mock,
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+) -> None:
+    pause_reading_mock.side_effect = original_pause_reading
+    count = 4000
+    sequence = [MessageData.fake() for _ in range(count)]
+    server_config.flow_control = FlowControlConfig(read_overflow="pause")
+
+    # Source is sending messages but there are no sink readers started
+    client_zmq_writer.start()
+
+    async with run_services(server_config, client_config):
+        for data in sequence:
+            await asyncio.sleep(0)
+            client_zmq_writer.send_message(*data)
+
+        await asyncio.sleep(1)
+
+    assert pause_reading_mock.called
+    assert not increment_drops_mock.called
+
+
+@pytest.mark.asyncio
+@unittest.mock.patch.object(ServiceConnection, "increment_drops", autospec=True)
+async def test_when_sink_buffer_exceeded_and_credits(
+    increment_drops_mock: Mock,
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+) -> None:
+    count = 4000
+    sequence = [MessageData.fake() for _ in range(count)]
+    client_config.flow_control = FlowControlConfig(credits=True)
+    server_config.flow_control = FlowControlConfig(credits=True)
+
+    # Source is sending messages but there are no sink readers started
+    client_zmq_writer.start()
+
+    async with run_services(server_config, client_config) as (server, _):
+        for data in sequence:
+            await asyncio.sleep(0)
+            client_zmq_writer.send_message(*data)
+
+        await asyncio.sleep(1)
+
+        assert all(
+            connection.sink_queue.qsize() <= server._sink_capacity
+            for connection in server._connections
+        )
+
+    assert not increment_drops_mock.called
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+async def test_identity_pipeline_when_credits(
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(500, 1000)
+    sequence = [MessageData.fake() for _ in range(count)]
+    client_config.flow_control = FlowControlConfig(credits=True)
+    server_config.flow_control = FlowControlConfig(credits=True)
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with run_services(server_config, client_config):
+        results = await helpers.zmq.exchange_messages(
+            client_zmq_writer, client_zmq_reader, sequence, timeout=30, interval=0
+        )
+
+    assert len(results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+async def test_identity_pipeline_when_session_resumed(
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(500, 1000)
+    sequence = [MessageData.fake() for _ in range(count)]
+    client_config.session = SessionConfig(enabled=True)
+    client_config.websockets.reconnect_timeout = 0.1
+    server_config.session = SessionConfig(enabled=True)
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with run_services(server_config, client_config) as (server, _):
+        results_sink = asyncio.create_task(
+            helpers.zmq.receive_results(client_zmq_reader, count, timeout=30)
+        )
+        for idx, data in enumerate(sequence):
+            if idx == count // 2 and server._connections:
+                transport = server._connections[0].transport
+                assert transport
+                transport.disconnect()
+            client_zmq_writer.send_message(*data)
+            await asyncio.sleep(0)
+        results = await results_sink
+
+    assert len(results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+async def test_identity_pipeline_when_multiple_clients(
+    server: ServerService,
+    client_config: ClientServiceConfig,
+    second_client_config: ClientServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+    second_client_zmq_writer: NonBlockingWriter,
+    second_client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(32, 64)
+    sequence = [
+        MessageData.fake()._replace(topic=f"first-{i}".encode()) for i in range(count)
+    ]
+    second_sequence = [
+        MessageData.fake()._replace(topic=f"second-{i}".encode()) for i in range(count)
+    ]
+    for zmq_io in (
+        client_zmq_writer,
+        client_zmq_reader,
+        second_client_zmq_writer,
+        second_client_zmq_reader,
+    ):
+        zmq_io.start()
+
+    asyncio.create_task(server.run())
+    await server.started.wait()
+
+    async with (
+        ClientService(client_config) as client,
+        ClientService(second_client_config) as second_client,
+    ):
+        asyncio.create_task(client.run())
+        asyncio.create_task(second_client.run())
+        await client.started.wait()
+        await second_client.started.wait()
+
+        results_sink = asyncio.create_task(
+            helpers.zmq.receive_results(client_zmq_reader, count, timeout=10)
+        )
+        second_results_sink = asyncio.create_task(
+            helpers.zmq.receive_results(second_client_zmq_reader, count, timeout=10)
+        )
+        for data, second_data in zip(sequence, second_sequence):
+            client_zmq_writer.send_message(*data)
+            second_client_zmq_writer.send_message(*second_data)
+            await asyncio.sleep(0)
+        results = await results_sink
+        second_results = await second_results_sink
+
+    assert len(results) == count
+    assert len(second_results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+    assert all(
+        expected.is_same(res) for res, expected in zip(second_results, second_sequence)
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+async def test_identity_pipeline_when_one_client_paused(
+    server: ServerService,
+    client_config: ClientServiceConfig,
+    second_client_config: ClientServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+    second_client_zmq_writer: NonBlockingWriter,
+    second_client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(32, 64)
+    paused_data = MessageData.fake()._replace(topic=b"paused")
+    sequence = [MessageData.fake()._replace(topic=b"healthy") for _ in range(count)]
+    for zmq_io in (
+        client_zmq_writer,
+        client_zmq_reader,
+        second_client_zmq_writer,
+        second_client_zmq_reader,
+    ):
+        zmq_io.start()
+
+    asyncio.create_task(server.run())
+    await server.started.wait()
+
+    async with (
+        ClientService(client_config) as client,
+        ClientService(second_client_config) as second_client,
+    ):
+        asyncio.create_task(client.run())
+        asyncio.create_task(second_client.run())
+        await client.started.wait()
+        await second_client.started.wait()
+
+        client_zmq_writer.send_message(*paused_data)
+        paused_result = await helpers.zmq.receive_result(client_zmq_reader)
+        paused = server._routes[b"paused"]
+        paused.pause_writing()
+        for _ in range(count):
+            client_zmq_writer.send_message(*paused_data)
+
+        results = await helpers.zmq.exchange_messages(
+            second_client_zmq_writer,
+            second_client_zmq_reader,
+            sequence,
+            timeout=10,
+            interval=0,
+        )
+
+        assert paused.backlog
+        paused.resume_writing()
+
+    assert paused_data.is_same(paused_result)
+    assert len(results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+async def test_identity_pipeline_when_stripes(
+    server: ServerService,
+    client_config: ClientServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    stripes = 3
+    count = fake.random_int(64, 128)
+    topics = [f"source-{i}".encode() for i in range(stripes * 2)]
+    sequence = [
+        MessageData.fake()._replace(topic=fake.random_element(topics))
+        for _ in range(count)
+    ]
+    client_config.websockets.stripes = stripes
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    asyncio.create_task(server.run())
+    await server.started.wait()
+
+    async with ClientService(client_config) as client:
+        asyncio.create_task(client.run())
+        await client.started.wait()
+        async with asyncio.timeout(5):
+            while len(client._connections) < stripes:
+                await asyncio.sleep(0.01)
+
+        results = await helpers.zmq.exchange_messages(
+            client_zmq_writer, client_zmq_reader, sequence, timeout=10, interval=0
+        )
+
+    assert len(results) == count
+    for topic in topics:
+        topic_sequence = [data for data in sequence if data.topic == topic]
+        topic_results = [
+            res
+            for res in results
+            if isinstance(res, ReaderResultMessage) and res.topic == topic
+        ]
+        assert len(topic_results) == len(topic_sequence)
+        assert all(
+            expected.is_same(res)
+            for res, expected in zip(topic_results, topic_sequence)
+        )
+
+
+def test_stripes_when_reconnected(client_config: ClientServiceConfig) -> None:
+    stripes = 3
+    topics = [f"source-{i}".encode() for i in range(stripes * 10)]
+    client_config.websockets.stripes = stripes
+    client = ClientService(client_config)
+    connections = [ServiceConnection(client) for _ in range(stripes)]
+
+    client._add_connection(connections[0])
+    startup_routes = [client._route(topic) for topic in topics]
+    for connection in connections[1:]:
+        client._add_connection(connection)
+    routes = [client._route(topic) for topic in topics]
+    client._remove_connection(connections[1])
+    fallback_routes = [client._route(topic) for topic in topics]
+
+    assert all(route is connections[0] for route in startup_routes)
+    assert routes == [connections[zlib.crc32(topic) % stripes] for topic in topics]
+    assert len(set(map(id, routes))) == stripes
+    assert connections[1] not in fallback_routes
+    assert all(
+        fallback is route
+        for fallback, route in zip(fallback_routes, routes)
+        if route is not connections[1]
+    )
+
+
+@pytest.mark.parametrize("spillover", [False, True])
+def test_dispatch_when_backlog_full(
+    tmp_path: pathlib.Path, client_config: ClientServiceConfig, spillover: bool
+) -> None:
+    client_config.scheduling.max_pending = 2
+    if spillover:
+        client_config.spillover = SpilloverConfig(path=str(tmp_path / "spillover"))
+    client = ClientService(client_config)
+    connection = ServiceConnection(client)
+    connection.transport = Mock()
+    connection.credit_mode = True
+    client._add_connection(connection)
+    records = [
+        protocol.RawRecord(b"topic", fake.binary(length=10), b"") for _ in range(5)
+    ]
+
+    for record in records:
+        client._dispatch(record, "Bulk")
+
+    assert connection.backlog_full()
+    if spillover:
+        assert client._spill
+        assert list(connection.backlog) == records[1:3]
+        assert len(client._spill) == 2
+    else:
+        assert list(connection.backlog) == records[1:]
+        assert client._backlog_full()
+
+
+@unittest.mock.patch.object(ServiceConnection, "return_credits", autospec=True)
+def test_ws_frame_when_duplicate(
+    return_credits_mock: Mock, server_config: ServerServiceConfig
+) -> None:
+    server = ServerService(server_config)
+    connection = ServiceConnection(server, Session.create(replay_bytes=1 << 20))
+    connection.transport = Mock()
+    batch = protocol.FrameBatch(16, 1 << 20)
+    for _ in range(3):
+        batch.append_record(protocol.RawRecord(b"topic", fake.binary(10), b""))
+    data = protocol.pack_sequenced_frame(1, batch.pack())
+    frame = Mock(msg_type=WSMsgType.BINARY)
+    frame.get_payload_as_memoryview.side_effect = lambda: memoryview(data)
+
+    connection.on_ws_frame(connection.transport, frame)
+    connection.on_ws_frame(connection.transport, frame)
+
+    assert connection.sink_queue.qsize() == 3
+    assert return_credits_mock.call_args_list == [
+        call(connection, 0),
+        call(connection, 3),
+    ]
+
+
+def test_resume_session_when_credits(server_config: ServerServiceConfig) -> None:
+    server = ServerService(server_config)
+    session = Session.create(replay_bytes=1 << 20)
+    for messages in (2, 3, 4):
+        session.sequence(fake.binary(10), messages)
+    connection = ServiceConnection(server, session)
+    connection.transport = Mock()
+    connection.credit_mode = True
+    connection.peer_ack = 1
+
+    server._resume_session(connection)
+
+    assert connection.transport.send.call_count == 2
+    assert connection.credits == -7
+
+
+@unittest.mock.patch.object(Measurements, "increment_shed_messages", autospec=True)
+def test_disconnect_when_unsent(
+    increment_shed_messages_mock: Mock, client_config: ClientServiceConfig
+) -> None:
+    client = ClientService(client_config)
+    connection = ServiceConnection(client)
+    client._add_connection(connection)
+    records = [
+        protocol.RawRecord(b"topic", fake.binary(length=10), b"") for _ in range(3)
+    ]
+    connection.batch.append_record(records[0])
+    connection.backlog.extend(records[1:])
+
+    connection.on_ws_disconnected(Mock())
+
+    increment_shed_messages_mock.assert_called_once_with(
+        client._measurements, "Source", "Disconnected", len(records)
+    )
+    assert not connection.backlog
+    assert not client._connections
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+@unittest.mock.patch.object(Measurements, "increment_shed_messages", autospec=True)
+async def test_identity_pipeline_when_stale_frames(
+    increment_shed_messages_mock: Mock,
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(8, 16)
+    sequence = [
+        MessageData(
+            topic=fake.domain_word().encode(),
+            msg=MessageData.fake_video_frame().to_message(),
+            extra=None,
+        )
+        for _ in range(count)
+    ]
+    server_config.shedding = SheddingConfig(max_age=1e-6)
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with run_services(server_config, client_config):
+        results = await helpers.zmq.exchange_messages(
+            client_zmq_writer, client_zmq_reader, sequence, timeout=3
+        )
+
+    assert not results
+    increment_shed_messages_mock.assert_any_call(unittest.mock.ANY, "Sink", "Stale")
+    assert increment_shed_messages_mock.call_count == count
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+@unittest.mock.patch.object(Metrics, "messages")
+async def test_identity_pipeline_when_passthrough(
+    messages_mock: Mock,
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    sample_every = fake.random_int(5, 10)
+    count = sample_every * fake.random_int(10, 20)
+    sequence = [MessageData.fake() for _ in range(count)]
+    client_config.passthrough = PassthroughConfig(True, sample_every)
+    server_config.passthrough = PassthroughConfig(True, sample_every)
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with run_services(server_config, client_config):
+        results = await helpers.zmq.exchange_messages(
+            client_zmq_writer, client_zmq_reader, sequence, timeout=30, interval=0
+        )
+
+    assert len(results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+    assert messages_mock.add.call_count == 4 * count // sample_every
+    assert sum(c.args[0] for c in messages_mock.add.call_args_list) == 4 * count
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+@unittest.mock.patch.object(Measurements, "measure_clock_sync")
+async def test_identity_pipeline_when_clock_synced(
+    measure_clock_sync_mock: Mock,
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(100, 200)
+    sequence = [MessageData.fake() for _ in range(count)]
+    client_config.clock_sync = ClockSyncConfig(enabled=True, interval=0.01)
+    server_config.clock_sync = ClockSyncConfig(enabled=True, interval=0.01)
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with run_services(server_config, client_config) as (server, client):
+        results = await helpers.zmq.exchange_messages(
+            client_zmq_writer, client_zmq_reader, sequence, timeout=30, interval=0.001
+        )
+
+        assert client._connections[0].clock
+        assert server._connections[0].clock
+
+    assert len(results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+    assert measure_clock_sync_mock.called
+    for offset, rtt in (c.args for c in measure_clock_sync_mock.call_args_list):
+        assert abs(offset) < rtt + 0.01
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+@unittest.mock.patch.object(Measurements, "measure_loop_lag")
+async def test_identity_pipeline_when_loop_monitored(
+    measure_loop_lag_mock: Mock,
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(100, 200)
+    sequence = [MessageData.fake() for _ in range(count)]
+    client_config.loop_monitor = LoopMonitorConfig(enabled=True, interval=0.01)
+    server_config.loop_monitor = LoopMonitorConfig(enabled=True, interval=0.01)
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with run_services(server_config, client_config):
+        results = await helpers.zmq.exchange_messages(
+            client_zmq_writer, client_zmq_reader, sequence, timeout=30, interval=0.001
+        )
+
+    assert len(results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+    assert measure_loop_lag_mock.called
+    assert all(c.args[0] >= 0 for c in measure_loop_lag_mock.call_args_list)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+@unittest.mock.patch.object(Measurements, "measure_stage")
+async def test_identity_pipeline_when_stage_latency(
+    measure_stage_mock: Mock,
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(100, 200)
+    sequence = [MessageData.fake() for _ in range(count)]
+    client_config.metrics = MetricsConfig(stage_latency=True)
+    server_config.metrics = MetricsConfig(stage_latency=True)
+    server_config.serialization = SerializationConfig(workers=2)
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with run_services(server_config, client_config):
+        results = await helpers.zmq.exchange_messages(
+            client_zmq_writer, client_zmq_reader, sequence, timeout=30, interval=0
+        )
+
+    assert len(results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+    stages = [c.args[0] for c in measure_stage_mock.call_args_list]
+    for stage in ("Serialize", "Deserialize", "Batching", "SinkQueue"):
+        assert stages.count(stage) >= 2 * count
+    assert all(c.args[1] >= 0 for c in measure_stage_mock.call_args_list)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("identity_pipeline")
+async def test_identity_pipeline_when_flight_recorded(
+    client_config: ClientServiceConfig,
+    server_config: ServerServiceConfig,
+    client_zmq_writer: NonBlockingWriter,
+    client_zmq_reader: NonBlockingReader,
+) -> None:
+    count = fake.random_int(100, 200)
+    sequence = [MessageData.fake() for _ in range(count)]
+    recorder = FlightRecorderConfig(enabled=True, size=4 * count)
+    client_config.metrics = MetricsConfig(flight_recorder=recorder)
+    server_config.metrics = MetricsConfig(flight_recorder=recorder)
+    server_config.serialization = SerializationConfig(workers=2)
+
+    client_zmq_writer.start()
+    client_zmq_reader.start()
+
+    async with run_services(server_config, client_config) as (server, client):
+        results = await helpers.zmq.exchange_messages(
+            client_zmq_writer, client_zmq_reader, sequence, timeout=30, interval=0
+        )
+
+    assert len(results) == count
+    assert all(expected.is_same(res) for res, expected in zip(results, sequence))
+    for service in (client, server):
+        assert service.flight_recorder
+        entries = service.flight_recorder.snapshot()
+        for socket in ("Source", "Sink"):
+            recorded = [entry for entry in entries if entry.socket == socket]
+            assert len(recorded) == count
+            assert all(entry.size > 0 for entry in recorded)
+            assert all(entry.enqueue_depth >= 0 for entry in recorded)
+            assert all(entry.dequeue_depth >= 0 for entry in recorded)
+            assert [entry.topic for entry in recorded] == [
+                data.topic.decode() for data in sequence
+            ]
+
+
+@pytest.mark.asyncio
+async def test_serialization_executor_when_stopped(
+    server_config: ServerServiceConfig,
+) -> None:
+    server_config.serialization = SerializationConfig(workers=2)
+
+    async with ServerService(server_config) as server:
+        executor = server._executor
+        assert executor
+
+    with pytest.raises(RuntimeError):
+        executor.submit(int)
+
+
+def test_passthrough_when_message_inspected(server_config: ServerServiceConfig) -> None:
+    server_config.passthrough = PassthroughConfig(enabled=True)
+    server_config.shedding = SheddingConfig(max_age=1.0)
+
+    with pytest.raises(ValueError):
+        ServerService(server_config)
+
+
+def test_passthrough_when_flight_recorded(server_config: ServerServiceConfig) -> None:
+    server_config.passthrough = PassthroughConfig(enabled=True)
+    recorder = FlightRecorderConfig(enabled=True)
+    server_config.metrics = MetricsConfig(flight_recorder=recorder)
+
+    with pytest.raises(ValueError):
+        ServerService(server_config)
+
+
+def test_shedding_when_metrics_sampled(server_config: ServerServiceConfig) -> None:
+    server_config.metrics = MetricsConfig(sampling=SamplingConfig(every=10))
+    server_config.shedding = SheddingConfig(max_age=1.0)
+
+    with pytest.raises(ValueError):
+        ServerService(server_config)
+
+
 @pytest.mark.asyncio
 async def test_messages_at_every_ends(
     server: ServerService,
@@ -342,3 +1303,41 @@ async def test_messages_at_every_ends(
     assert original_data.is_same(server_input)
     assert isinstance(client_output, ReaderResultMessage)
     assert processed_data.is_same(client_output)
+
+
+@pytest.mark.asyncio
+async def test_zmq_reader_when_receive_async(
+    client_zmq_src_config: ZMQReaderConfig, client_zmq_writer: NonBlockingWriter
+) -> None:
+    data = MessageData.fake()
+
+    async def receive_message(reader: NonBlockingReader) -> ReaderResultMessage:
+        while True:
+            result = await reader.receive_async(timeout=0.1)
+            if isinstance(result, ReaderResultMessage):
+                return result
+
+    with NonBlockingReader(*client_zmq_src_config.as_router().to_args()) as reader:
+        reader.start()
+        client_zmq_writer.start()
+
+        receiving = asyncio.create_task(receive_message(reader))
+        await asyncio.sleep(0.5)
+        client_zmq_writer.send_message(*data)
+        result = await asyncio.wait_for(receiving, 5)
+
+    assert data.is_same(result)
+
+
+@pytest.mark.asyncio
+async def test_zmq_reader_when_receive_async_failed(
+    client_zmq_src_config: ZMQReaderConfig,
+) -> None:
+    reader = NonBlockingReader(*client_zmq_src_config.as_router().to_args())
+    reader._reader = Mock()
+    reader._reader.try_receive.return_value = None
+    reader._reader.is_shutdown.return_value = False
+    reader._reader.receive.side_effect = RuntimeError("Reader is not started")
+
+    with pytest.raises(RuntimeError):
+        await reader.receive_async(timeout=1)
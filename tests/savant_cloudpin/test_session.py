@@ -0,0 +1,87 @@
+from faker import Faker
+
+from savant_cloudpin.services import _protocol as protocol
+from savant_cloudpin.services._session import Session
+
+fake = Faker()
+
+
+def sequence_frames(session: Session, count: int, size: int = 100) -> list[bytes]:
+    return [session.sequence(fake.binary(length=size)) for _ in range(count)]
+
+
+def seq_numbers(frames: list[bytes]) -> list[int | None]:
+    return [protocol.split_sequenced_frame(memoryview(frame))[0] for frame in frames]
+
+
+def test_session_sequence() -> None:
+    session = Session.create(replay_bytes=1 << 20)
+
+    frames = sequence_frames(session, 5)
+
+    assert seq_numbers(frames) == [1, 2, 3, 4, 5]
+    assert len(session.ring) == 5
+    assert session.ring_size == sum(len(frame) for frame in frames)
+
+
+def test_session_when_replay_bytes_exceeded() -> None:
+    frame_size = protocol.SEQUENCED_HEAD_SIZE + 100
+    session = Session.create(replay_bytes=3 * frame_size)
+
+    sequence_frames(session, 5)
+
+    assert [seq for seq, _, _ in session.ring] == [3, 4, 5]
+    assert session.ring_size == 3 * frame_size
+
+
+def test_session_replay() -> None:
+    session = Session.create(replay_bytes=1 << 20)
+    frames = sequence_frames(session, 5)
+
+    session.acknowledge(2)
+    replay = session.replay(peer_ack=3)
+
+    assert replay == frames[3:]
+    assert seq_numbers(replay) == [4, 5]
+    assert session.pending_messages() == 2
+
+
+def test_session_receive() -> None:
+    session = Session.create(replay_bytes=1 << 20)
+
+    assert session.receive(1) == 0
+    assert session.receive(2) == 0
+    assert session.receive(2) is None
+    assert session.receive(1) is None
+    assert session.receive(5) == 2
+    assert session.last_received == 5
+    assert session.unacked == 3
+
+
+def test_session_needs_ack() -> None:
+    session = Session.create(replay_bytes=1 << 20)
+    session.receive(1)
+    now = session.last_ack
+
+    assert not session.needs_ack(frames=2, interval=10, now=now)
+    assert session.needs_ack(frames=2, interval=10, now=now + 10)
+    session.receive(2)
+    assert session.needs_ack(frames=2, interval=10, now=now)
+    session.mark_acked(now)
+    assert not session.needs_ack(frames=2, interval=10, now=now + 10)
+
+
+def test_session_attach() -> None:
+    session = Session.create(replay_bytes=1 << 20)
+    connection = object()
+
+    assert session.attach(connection) is None  # type: ignore
+    session.detach([b"topic"])
+    assert session.topics == [b"topic"]
+    assert not session.is_expired(grace=10, now=session.detached_at + 1)
+    assert session.is_expired(grace=10, now=session.detached_at + 11)
+
+    resume_time = session.attach(connection)  # type: ignore
+
+    assert resume_time is not None and resume_time >= 0
+    assert not session.is_expired(grace=10, now=session.detached_at + 11)
@@ -0,0 +1,128 @@
+import pathlib
+import time
+import unittest.mock
+
+from faker import Faker
+
+from savant_cloudpin.services._protocol import RawRecord
+from savant_cloudpin.services._spill import ENTRY_HEAD_SIZE, SpillRing
+
+fake = Faker()
+
+
+def make_record(size: int = 100) -> RawRecord:
+    return RawRecord(fake.pystr().encode(), fake.binary(length=size), b"")
+
+
+def drain(spill: SpillRing) -> list[RawRecord]:
+    result = list[RawRecord]()
+    while record := spill.pop():
+        result.append(record)
+    return result
+
+
+def test_spill_ring(tmp_path: pathlib.Path) -> None:
+    spill = SpillRing(str(tmp_path / "spill"), max_bytes=1 << 20, max_age=0)
+    sequence = [make_record(fake.random_int(0, 1000)) for _ in range(100)]
+
+    for record in sequence:
+        assert spill.push(record)
+
+    assert len(spill) == len(sequence)
+    assert drain(spill) == sequence
+    assert not spill
+    assert spill.used == 0
+
+
+def test_spill_ring_when_wrapped(tmp_path: pathlib.Path) -> None:
+    spill = SpillRing(str(tmp_path / "spill"), max_bytes=1000, max_age=0)
+    expected = list[RawRecord]()
+
+    for _ in range(50):
+        for _ in range(3):
+            record = make_record(fake.random_int(1, 150))
+            spill.push(record)
+            expected.append(record)
+        del expected[: len(expected) - len(spill)]
+        expected_first = expected.pop(0)
+        assert spill.pop() == expected_first
+        assert 0 <= spill.used <= spill.capacity
+
+    assert drain(spill) == expected
+    assert spill.evicted > 0
+
+
+def test_spill_ring_when_overflow(tmp_path: pathlib.Path) -> None:
+    spill = SpillRing(str(tmp_path / "spill"), max_bytes=10000, max_age=0)
+    sequence = [make_record() for _ in range(200)]
+
+    for record in sequence:
+        spill.push(record)
+
+    assert spill.evicted == len(sequence) - len(spill)
+    assert drain(spill) == sequence[spill.evicted :]
+
+
+def test_spill_ring_when_record_too_large(tmp_path: pathlib.Path) -> None:
+    spill = SpillRing(str(tmp_path / "spill"), max_bytes=1000, max_age=0)
+
+    assert not spill.push(make_record(1000 - ENTRY_HEAD_SIZE))
+    assert not spill
+
+
+def test_spill_ring_when_expired(tmp_path: pathlib.Path) -> None:
+    spill = SpillRing(str(tmp_path / "spill"), max_bytes=1 << 20, max_age=60)
+    spill.push(make_record())
+    now = time.time()
+
+    with unittest.mock.patch("time.time", return_value=now + 61):
+        assert spill.pop() is None
+
+    assert spill.expired == 1
+    assert not spill
+
+
+def test_spill_ring_when_reopened(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "spill")
+    spill = SpillRing(path, max_bytes=1 << 20, max_age=0)
+    sequence = [make_record() for _ in range(10)]
+    for record in sequence:
+        spill.push(record)
+    spill.pop()
+    spill.flush()
+
+    reopened = SpillRing(path, max_bytes=1 << 20, max_age=0)
+
+    assert drain(reopened) == sequence[1:]
+
+
+def test_spill_ring_topics(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "spill")
+    spill = SpillRing(path, max_bytes=1 << 20, max_age=0)
+    first, second = make_record(), make_record()
+    spill.push(first)
+    spill.push(second)
+    spill.push(first)
+    spill.flush()
+
+    reopened = SpillRing(path, max_bytes=1 << 20, max_age=0)
+    assert reopened.has_topic(first.topic)
+    assert reopened.has_topic(second.topic)
+
+    spill.pop()
+    assert spill.has_topic(first.topic)
+    spill.pop()
+    assert not spill.has_topic(second.topic)
+    spill.pop()
+    assert not spill.topics
+
+
+def test_spill_ring_topics_when_overflow(tmp_path: pathlib.Path) -> None:
+    spill = SpillRing(str(tmp_path / "spill"), max_bytes=1000, max_age=0)
+    sequence = [make_record(fake.random_int(1, 150)) for _ in range(50)]
+
+    for record in sequence:
+        spill.push(record)
+
+    assert sum(spill.topics.values()) == len(spill)
+    assert set(spill.topics) == {record.topic for record in sequence[spill.evicted :]}
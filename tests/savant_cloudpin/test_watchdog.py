@@ -0,0 +1,32 @@
+import time
+import unittest.mock
+from unittest.mock import Mock
+
+from savant_cloudpin.services import _watchdog
+from savant_cloudpin.services._watchdog import LoopWatchdog
+
+
+def test_loop_watchdog_check() -> None:
+    watchdog = LoopWatchdog(threshold=0.5)
+    watchdog.expect(10.0)
+
+    assert watchdog.check(10.2) is None
+    stack = watchdog.check(10.6)
+    assert stack and "test_loop_watchdog_check" in stack
+    assert watchdog.check(11.0) is None
+
+    watchdog.expect(11.0)
+    assert watchdog.check(11.2) is None
+    assert watchdog.check(11.6)
+
+
+@unittest.mock.patch.object(_watchdog, "logger")
+def test_loop_watchdog_when_loop_blocked(logger_mock: Mock) -> None:
+    watchdog = LoopWatchdog(threshold=0.05)
+    watchdog.start()
+    watchdog.expect(time.monotonic())
+    time.sleep(0.2)
+    watchdog.stop()
+
+    logger_mock.warning.assert_called_once()
+    assert "time.sleep(0.2)" in logger_mock.warning.call_args.args[0]